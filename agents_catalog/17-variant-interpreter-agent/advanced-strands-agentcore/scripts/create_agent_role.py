@@ -6,9 +6,77 @@ Creates role: agentcore-agentcore_strands-role-{datestamp}
 
 import boto3
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from botocore.exceptions import ClientError
 
+# Policy documents are static, so serialize them once at import time instead
+# of rebuilding the dicts and re-running json.dumps on every call.
+
+# Trust policy for the role (allows Lambda and Bedrock to assume this role)
+TRUST_POLICY_JSON = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {
+                "Service": [
+                    "lambda.amazonaws.com",
+                    "bedrock.amazonaws.com",
+                    "omics.amazonaws.com"
+                ]
+            },
+            "Action": "sts:AssumeRole"
+        }
+    ]
+})
+
+# Custom inline policy for additional permissions
+CUSTOM_POLICY_JSON = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": [
+                "bedrock-agentcore:*"
+            ],
+            "Resource": "*"
+        },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "bedrock:InvokeModel",
+                "bedrock:InvokeModelWithResponseStream",
+                "bedrock:ListKnowledgeBases"
+            ],
+            "Resource": "*"
+        },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "lambda:InvokeFunction"
+            ],
+            "Resource": "*"
+        },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "s3:GetObject"
+            ],
+            "Resource": "*"
+        },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "logs:CreateLogGroup",
+                "logs:CreateLogStream",
+                "logs:PutLogEvents"
+            ],
+            "Resource": "arn:aws:logs:*:*:*"
+        }
+    ]
+})
+
 def create_agent_role():
     """Create IAM role with specified permissions for agent core."""
     
@@ -20,30 +88,12 @@ def create_agent_role():
     role_name = f'agentcore-agentcore_strands-role-{datestamp}'
     
     print(f"Creating IAM role: {role_name}")
-    
-    # Trust policy for the role (allows Lambda and Bedrock to assume this role)
-    trust_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Principal": {
-                    "Service": [
-                        "lambda.amazonaws.com",
-                        "bedrock.amazonaws.com",
-                        "omics.amazonaws.com"
-                    ]
-                },
-                "Action": "sts:AssumeRole"
-            }
-        ]
-    }
-    
+
     try:
         # Create the IAM role
         response = iam.create_role(
             RoleName=role_name,
-            AssumeRolePolicyDocument=json.dumps(trust_policy),
+            AssumeRolePolicyDocument=TRUST_POLICY_JSON,
             Description=f'Agent core role created on {datestamp} with exploratory permissions',
             MaxSessionDuration=3600
         )
@@ -58,68 +108,30 @@ def create_agent_role():
             'arn:aws:iam::aws:policy/AmazonOmicsFullAccess'
         ]
         
-        for policy_arn in managed_policies:
+        def attach_policy(policy_arn):
             try:
                 iam.attach_role_policy(
                     RoleName=role_name,
                     PolicyArn=policy_arn
                 )
-                print(f"✅ Attached managed policy: {policy_arn}")
+                return policy_arn, None
             except ClientError as e:
-                print(f"❌ Failed to attach managed policy {policy_arn}: {e}")
-        
-        # Create custom inline policy for additional permissions
-        custom_policy = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {
-                    "Effect": "Allow",
-                    "Action": [
-                        "bedrock-agentcore:*"
-                    ],
-                    "Resource": "*"
-                },
-                {
-                    "Effect": "Allow",
-                    "Action": [
-                        "bedrock:InvokeModel",
-                        "bedrock:InvokeModelWithResponseStream",
-                        "bedrock:ListKnowledgeBases"
-                    ],
-                    "Resource": "*"
-                },
-                {
-                    "Effect": "Allow",
-                    "Action": [
-                        "lambda:InvokeFunction"
-                    ],
-                    "Resource": "*"
-                },
-                {
-                    "Effect": "Allow",
-                    "Action": [
-                        "s3:GetObject"
-                    ],
-                    "Resource": "*"
-                },
-                {
-                    "Effect": "Allow",
-                    "Action": [
-                        "logs:CreateLogGroup",
-                        "logs:CreateLogStream",
-                        "logs:PutLogEvents"
-                    ],
-                    "Resource": "arn:aws:logs:*:*:*"
-                }
-            ]
-        }
+                return policy_arn, e
+
+        # Attach policies in parallel; each call is an independent IAM roundtrip
+        with ThreadPoolExecutor(max_workers=len(managed_policies)) as pool:
+            for policy_arn, error in pool.map(attach_policy, managed_policies):
+                if error is None:
+                    print(f"✅ Attached managed policy: {policy_arn}")
+                else:
+                    print(f"❌ Failed to attach managed policy {policy_arn}: {error}")
         
         # Attach the custom inline policy
         try:
             iam.put_role_policy(
                 RoleName=role_name,
                 PolicyName=f'{role_name}-custom-policy',
-                PolicyDocument=json.dumps(custom_policy)
+                PolicyDocument=CUSTOM_POLICY_JSON
             )
             print(f"✅ Attached custom inline policy with additional permissions")
         except ClientError as e:
@@ -1,16 +1,12 @@
 import streamlit as st
+import html
 import os
 from dotenv import load_dotenv
 import base64
 
 # Load environment variables from .env file for local development
 load_dotenv()
-from agents.medical_coordinator import MedicalCoordinator
 from config_file import ENABLE_AUTHENTICATION, AWS_DEFAULT_REGION
-import tools.device_status
-import tools.pubmed_search
-import tools.clinical_trials
-from strands_tools import calculator, current_time
 
 # Initialize session state for conversation history
 if "messages" not in st.session_state:
@@ -37,8 +33,8 @@ def check_authentication():
     if 'authenticated' in st.session_state and st.session_state.authenticated:
         # Add logout functionality in sidebar
         with st.sidebar:
-            # Sanitize username display to prevent XSS
-            safe_username = st.session_state.username.replace('<', '&lt;').replace('>', '&gt;')
+            # Sanitize username display to prevent XSS (single C-level pass)
+            safe_username = html.escape(st.session_state.username, quote=False)
             st.success(f"🔐 Logged in as: {safe_username}")
             if st.button("🚪 Logout", key="logout_btn"):
                 # Clear session state
@@ -58,7 +54,7 @@ def check_authentication():
         
         if submit_button:
             # Sanitize inputs to prevent XSS
-            clean_username = input_username.replace('<', '&lt;').replace('>', '&gt;') if input_username else ''
+            clean_username = html.escape(input_username, quote=False) if input_username else ''
             if clean_username == username and input_password == password:
                 st.session_state.authenticated = True
                 st.session_state.username = clean_username
@@ -80,8 +76,8 @@ st.write("AI-powered assistant for medical device monitoring, literature researc
 
 # Display authentication status
 if ENABLE_AUTHENTICATION and 'username' in st.session_state:
-    # Sanitize username display to prevent XSS
-    safe_username = st.session_state.username.replace('<', '&lt;').replace('>', '&gt;')
+    # Sanitize username display to prevent XSS (single C-level pass)
+    safe_username = html.escape(st.session_state.username, quote=False)
     st.info(f"👤 **Authenticated User:** {safe_username}")
 elif not ENABLE_AUTHENTICATION:
     st.warning("⚠️ **Development Mode:** Authentication disabled")
@@ -107,6 +103,14 @@ with col2:
 # Initialize the medical coordinator agent (cached)
 @st.cache_resource
 def get_agent():
+    # Import the agent stack lazily so the login screen and page chrome
+    # render without paying the strands/tool import cost on cold start
+    from agents.medical_coordinator import MedicalCoordinator
+    import tools.device_status
+    import tools.pubmed_search
+    import tools.clinical_trials
+    from strands_tools import calculator, current_time
+
     return MedicalCoordinator(
         tools=[
             current_time,
@@ -153,49 +157,49 @@ if prompt or chat_prompt:
     
     # Display user message (sanitized to prevent XSS)
     with st.chat_message("user"):
-        safe_prompt = prompt.replace('<', '&lt;').replace('>', '&gt;') if prompt else ''
+        safe_prompt = html.escape(prompt, quote=False) if prompt else ''
         st.write(safe_prompt)
 
     # Prepare containers for response
     with st.chat_message("assistant"):
         st.session_state.details_placeholder = st.empty()  # Create a new placeholder
-    
+    stream_container = st.session_state.details_placeholder.container()
+
     # Clear previous output for new conversation
     st.session_state.output = []
+    st.session_state.output_placeholders = []
 
     # Create the callback handler to display streaming responses
     def custom_callback_handler(**kwargs):
-        def add_to_output(output_type, content, append = True):
-            if len(st.session_state.output) == 0:
-                st.session_state.output.append({"type": output_type, "content": content})
+        def render_item(placeholder, output_item):
+            if output_item["type"] == "tool_use":
+                placeholder.code(output_item["content"])
             else:
-                last_item = st.session_state.output[-1]
-                if last_item["type"] == output_type:
-                    if append:
-                        st.session_state.output[-1]["content"] += content
-                    else:
-                        st.session_state.output[-1]["content"] = content
+                placeholder.markdown(output_item["content"])
+
+        def add_to_output(output_type, content, append = True):
+            output = st.session_state.output
+            if output and output[-1]["type"] == output_type:
+                if append:
+                    output[-1]["content"] += content
                 else:
-                    st.session_state.output.append({"type": output_type, "content": content})
-
-        with st.session_state.details_placeholder.container():
-            # Process stream data
-            if "data" in kwargs:
-                add_to_output("data", kwargs["data"])
-            elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
-                tool_use_msg = "Using tool: " + kwargs["current_tool_use"]["name"] + " with args: " + str(kwargs["current_tool_use"]["input"])
-                add_to_output("tool_use", tool_use_msg, append = False)
-            elif "reasoningText" in kwargs:
-                add_to_output("reasoning", kwargs["reasoningText"])
-
-            # Display output
-            for output_item in st.session_state.output:
-                if output_item["type"] == "data":
-                    st.markdown(output_item["content"])
-                elif output_item["type"] == "tool_use":
-                    st.code(output_item["content"])
-                elif output_item["type"] == "reasoning":
-                    st.markdown(output_item["content"])
+                    output[-1]["content"] = content
+            else:
+                output.append({"type": output_type, "content": content})
+                # Allocate a dedicated placeholder for the new item
+                with stream_container:
+                    st.session_state.output_placeholders.append(st.empty())
+            # Only the last item can change, so re-render just its placeholder
+            render_item(st.session_state.output_placeholders[-1], output[-1])
+
+        # Process stream data
+        if "data" in kwargs:
+            add_to_output("data", kwargs["data"])
+        elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
+            tool_use_msg = "Using tool: " + kwargs["current_tool_use"]["name"] + " with args: " + str(kwargs["current_tool_use"]["input"])
+            add_to_output("tool_use", tool_use_msg, append = False)
+        elif "reasoningText" in kwargs:
+            add_to_output("reasoning", kwargs["reasoningText"])
     
     # Set callback handler into the agent
     st.session_state.agent.callback_handler = custom_callback_handler
@@ -203,6 +207,8 @@ if prompt or chat_prompt:
     # Get response from agent
     response = st.session_state.agent(prompt)
 
-    # When done, add assistant messages to chat history
-    for output_item in st.session_state.output:
-            st.session_state.messages.append({"role": "assistant", "type": output_item["type"] , "content": output_item["content"]})
\ No newline at end of file
+    # When done, add assistant messages to chat history in one batch
+    st.session_state.messages.extend(
+        {"role": "assistant", "type": output_item["type"], "content": output_item["content"]}
+        for output_item in st.session_state.output
+    )
\ No newline at end of file
@@ -1,6 +1,20 @@
+import ijson
 import requests
 from strands import tool
 
+# Only request the fields the parser below actually reads; this keeps the
+# API response payload small instead of returning the full protocol section.
+_STUDY_FIELDS = ",".join([
+    "protocolSection.identificationModule.nctId",
+    "protocolSection.identificationModule.briefTitle",
+    "protocolSection.statusModule.overallStatus",
+    "protocolSection.statusModule.startDateStruct",
+    "protocolSection.statusModule.completionDateStruct",
+    "protocolSection.designModule.phases",
+    "protocolSection.conditionsModule.conditions",
+    "protocolSection.armsInterventionsModule.interventions",
+])
+
 @tool
 def search_clinical_trials(condition: str, max_results: int = 5) -> str:
     """
@@ -18,20 +32,19 @@ def search_clinical_trials(condition: str, max_results: int = 5) -> str:
         params = {
             "query.cond": condition,
             "pageSize": max_results,
+            "fields": _STUDY_FIELDS,
             "format": "json"
         }
         
-        response = requests.get(url, params=params)
+        # Stream the response and parse studies incrementally so large
+        # payloads never need to be fully buffered before formatting starts
+        response = requests.get(url, params=params, stream=True, timeout=(3.05, 30))
         response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("studies"):
-            return f"No clinical trials found for condition: {condition}"
-        
-        studies = data["studies"]
+        response.raw.decode_content = True  # transparently handle gzip
+
         results = []
-        
-        for study in studies:
+
+        for study in ijson.items(response.raw, "studies.item"):
             protocol = study.get("protocolSection", {})
             identification = protocol.get("identificationModule", {})
             status_module = protocol.get("statusModule", {})
@@ -56,7 +69,10 @@ def search_clinical_trials(condition: str, max_results: int = 5) -> str:
             completion_date = status_module.get("completionDateStruct", {}).get("date", "Unknown")
             
             results.append(f"NCT ID: {nct_id}\nTitle: {title}\nConditions: {conditions}\nInterventions: {interventions_str}\nPhase: {phase}\nStatus: {status}\nStart Date: {start_date}\nCompletion Date: {completion_date}\nURL: https://clinicaltrials.gov/study/{nct_id}\n")
-        
+
+        if not results:
+            return f"No clinical trials found for condition: {condition}"
+
         return "\n".join(results)
         
     except Exception as e:
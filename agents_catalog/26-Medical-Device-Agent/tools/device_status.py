@@ -1,116 +1,146 @@
-import html
-import sqlite3
-from strands import tool
-import threading
-
-# Thread-local storage for database connections
-_local = threading.local()
-
-def get_db_connection():
-    if not hasattr(_local, 'connection'):
-        _local.connection = sqlite3.connect("medical_devices.db", check_same_thread=False)
-        _local.connection.execute("PRAGMA journal_mode=WAL")
-        _local.connection.execute("PRAGMA synchronous=NORMAL")
-    return _local.connection
-
-@tool
-def get_device_status(device_id: str) -> str:
-    """
-    Get the current status of a medical device.
-
-    Args:
-        device_id (str): The unique identifier of the medical device.
-
-    Returns:
-        str: Current status and details of the medical device.
-    """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Create the devices table if it doesn't exist
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS devices (
-        id TEXT PRIMARY KEY,
-        name TEXT,
-        type TEXT,
-        status TEXT,
-        location TEXT,
-        last_maintenance TEXT,
-        next_maintenance TEXT
-    )
-    """
-    )
-
-    # Insert sample data if table is empty
-    cursor.execute("SELECT COUNT(*) FROM devices")
-    if cursor.fetchone()[0] == 0:
-        sample_devices = [
-            ("DEV001", "MRI Scanner", "Imaging", "Operational", "Room 101", "2024-01-15", "2024-04-15"),
-            ("DEV002", "Ventilator", "Life Support", "Maintenance Required", "ICU-A", "2023-12-01", "2024-03-01"),
-            ("DEV003", "X-Ray Machine", "Imaging", "Operational", "Room 205", "2024-02-01", "2024-05-01"),
-        ]
-        cursor.executemany(
-            "INSERT INTO devices (id, name, type, status, location, last_maintenance, next_maintenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            sample_devices
-        )
-        conn.commit()
-
-    # Sanitize input to prevent XSS
-    sanitized_device_id = html.escape(device_id.strip())
-    cursor.execute("SELECT * FROM devices WHERE id = ?", (sanitized_device_id,))
-    device = cursor.fetchone()
-    
-    if device:
-        return f"Device {device[0]}: {device[1]} ({device[2]}) - Status: {device[3]}, Location: {device[4]}, Last Maintenance: {device[5]}, Next Maintenance: {device[6]}"
-    else:
-        return f"Device {device_id} not found"
-
-@tool
-def list_all_devices() -> str:
-    """
-    List all medical devices in the system.
-
-    Returns:
-        str: List of all medical devices with their current status.
-    """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS devices (
-        id TEXT PRIMARY KEY,
-        name TEXT,
-        type TEXT,
-        status TEXT,
-        location TEXT,
-        last_maintenance TEXT,
-        next_maintenance TEXT
-    )
-    """
-    )
-
-    cursor.execute("SELECT COUNT(*) FROM devices")
-    if cursor.fetchone()[0] == 0:
-        sample_devices = [
-            ("DEV001", "MRI Scanner", "Imaging", "Operational", "Room 101", "2024-01-15", "2024-04-15"),
-            ("DEV002", "Ventilator", "Life Support", "Maintenance Required", "ICU-A", "2023-12-01", "2024-03-01"),
-            ("DEV003", "X-Ray Machine", "Imaging", "Operational", "Room 205", "2024-02-01", "2024-05-01"),
-        ]
-        cursor.executemany(
-            "INSERT INTO devices (id, name, type, status, location, last_maintenance, next_maintenance) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            sample_devices
-        )
-        conn.commit()
-
-    cursor.execute("SELECT * FROM devices ORDER BY id")
-    devices = cursor.fetchall()
-    
-    if devices:
-        device_list = []
-        for device in devices:
-            device_list.append(f"ID: {device[0]}, Name: {device[1]}, Type: {device[2]}, Status: {device[3]}, Location: {device[4]}")
-        return "\n".join(device_list)
-    else:
-        return "No devices found in the system"
\ No newline at end of file
+import sqlite3
+from strands import tool
+import threading
+
+_DB_PATH = "medical_devices.db"
+
+# Thread-local storage for read-only connections
+_local = threading.local()
+
+# Single shared read-write connection; all writes serialize on _write_lock
+_writer = None
+_write_lock = threading.Lock()
+
+# One-time schema bootstrap state
+_init_lock = threading.Lock()
+_initialized = False
+
+# Module-level SQL so every call reuses the same statement objects from
+# SQLite's statement cache; project only the columns the formatters read
+SQL_GET = "SELECT id, name, type, status, location, last_maintenance, next_maintenance FROM devices WHERE id = ?"
+SQL_LIST = "SELECT id, name, type, status, location FROM devices ORDER BY id"
+
+_SAMPLE_DEVICES = [
+    ("DEV001", "MRI Scanner", "Imaging", "Operational", "Room 101", "2024-01-15", "2024-04-15"),
+    ("DEV002", "Ventilator", "Life Support", "Maintenance Required", "ICU-A", "2023-12-01", "2024-03-01"),
+    ("DEV003", "X-Ray Machine", "Imaging", "Operational", "Room 205", "2024-02-01", "2024-05-01"),
+]
+
+# One multi-row statement with the sample rows flattened into 21 parameters;
+# INSERT OR IGNORE lets the primary-key check stand in for a COUNT(*) probe
+_SQL_SEED = (
+    "INSERT OR IGNORE INTO devices (id, name, type, status, location, last_maintenance, next_maintenance) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?), (?, ?, ?, ?, ?, ?, ?), (?, ?, ?, ?, ?, ?, ?)"
+)
+_SEED_PARAMS = tuple(value for row in _SAMPLE_DEVICES for value in row)
+
+def _tune_connection(conn):
+    # Connection-scoped tuning: in-memory temp store, mmap'd reads, a
+    # 64 MiB page cache, and a busy timeout so writers don't error out
+    conn.executescript(
+        """
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-65536;
+        PRAGMA busy_timeout=3000;
+        """
+    )
+
+def _ensure_schema():
+    """Create the devices table and seed sample data exactly once per process."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        conn = get_writer()
+        with _write_lock:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS devices (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                type TEXT,
+                status TEXT,
+                location TEXT,
+                last_maintenance TEXT,
+                next_maintenance TEXT
+            )
+            """
+            )
+
+            # Seed sample data in a single explicit transaction: one prepare,
+            # one fsync, and already-present rows are ignored
+            conn.execute("BEGIN IMMEDIATE")
+            cursor.execute(_SQL_SEED, _SEED_PARAMS)
+            conn.commit()
+        _initialized = True
+
+def get_writer():
+    """Shared read-write connection; hold _write_lock around any write."""
+    global _writer
+    if _writer is None:
+        with _write_lock:
+            if _writer is None:
+                conn = sqlite3.connect(_DB_PATH, check_same_thread=False, cached_statements=256)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                _tune_connection(conn)
+                _writer = conn
+    return _writer
+
+def get_reader():
+    """Thread-local read-only connection; readers never take the writer lock."""
+    if not hasattr(_local, 'reader'):
+        _ensure_schema()  # the database file must exist before a mode=ro open
+        conn = sqlite3.connect(f"file:{_DB_PATH}?mode=ro", uri=True, check_same_thread=False, cached_statements=256)
+        _tune_connection(conn)
+        _local.reader = conn
+    return _local.reader
+
+@tool
+def get_device_status(device_id: str) -> str:
+    """
+    Get the current status of a medical device.
+
+    Args:
+        device_id (str): The unique identifier of the medical device.
+
+    Returns:
+        str: Current status and details of the medical device.
+    """
+    conn = get_reader()
+    cursor = conn.cursor()
+
+    # The bound ? placeholder makes this injection-safe; no escaping needed
+    cursor.execute(SQL_GET, (device_id.strip(),))
+    device = cursor.fetchone()
+
+    if device:
+        return f"Device {device[0]}: {device[1]} ({device[2]}) - Status: {device[3]}, Location: {device[4]}, Last Maintenance: {device[5]}, Next Maintenance: {device[6]}"
+    else:
+        return f"Device {device_id} not found"
+
+@tool
+def list_all_devices() -> str:
+    """
+    List all medical devices in the system.
+
+    Returns:
+        str: List of all medical devices with their current status.
+    """
+    conn = get_reader()
+    cursor = conn.cursor()
+
+    cursor.execute(SQL_LIST)
+    devices = cursor.fetchall()
+
+    if devices:
+        device_list = []
+        for device in devices:
+            device_list.append(f"ID: {device[0]}, Name: {device[1]}, Type: {device[2]}, Status: {device[3]}, Location: {device[4]}")
+        return "\n".join(device_list)
+    else:
+        return "No devices found in the system"
@@ -1,63 +1,106 @@
-import html
-from urllib.parse import quote
-import requests
-from strands import tool
-
-@tool
-def search_pubmed(query: str, max_results: int = 5) -> str:
-    """
-    Search PubMed for medical literature.
-
-    Args:
-        query (str): Search query for medical literature.
-        max_results (int): Maximum number of results to return (default: 5).
-
-    Returns:
-        str: Search results from PubMed.
-    """
-    try:
-        # Search PubMed using eSearch
-        search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-        # Sanitize query to prevent XSS
-        sanitized_query = html.escape(query.strip())
-        search_params = {
-            "db": "pubmed",
-            "term": sanitized_query,
-            "retmax": max_results,
-            "retmode": "json"
-        }
-        
-        search_response = requests.get(search_url, params=search_params)
-        search_data = search_response.json()
-        
-        if "esearchresult" not in search_data or not search_data["esearchresult"]["idlist"]:
-            return f"No results found for query: {query}"
-        
-        pmids = search_data["esearchresult"]["idlist"]
-        
-        # Fetch article details using eSummary
-        summary_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-        summary_params = {
-            "db": "pubmed",
-            "id": ",".join(pmids),
-            "retmode": "json"
-        }
-        
-        summary_response = requests.get(summary_url, params=summary_params)
-        summary_data = summary_response.json()
-        
-        results = []
-        for pmid in pmids:
-            if pmid in summary_data["result"]:
-                article = summary_data["result"][pmid]
-                title = article.get("title", "No title")
-                authors = ", ".join([author["name"] for author in article.get("authors", [])[:3]])
-                journal = article.get("source", "Unknown journal")
-                pub_date = article.get("pubdate", "Unknown date")
-                
-                results.append(f"PMID: {pmid}\nTitle: {title}\nAuthors: {authors}\nJournal: {journal}\nDate: {pub_date}\nURL: https://pubmed.ncbi.nlm.nih.gov/{pmid}/\n")
-        
-        return "\n".join(results)
-        
-    except Exception as e:
-        return f"Error searching PubMed: {str(e)}"
\ No newline at end of file
+import functools
+import os
+from itertools import islice
+from strands import tool
+
+# Persistent HTTP/2 client so the eSearch and eSummary calls multiplex over a
+# single TLS stream; built lazily on first tool call so agents that never
+# search PubMed don't pay the httpx import at cold start
+_client = None
+
+def _get_client():
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            transport=httpx.HTTPTransport(retries=3),
+            headers={"User-Agent": "medical-device-agent/1.0 (pubmed-search-tool)"},
+        )
+    return _client
+
+# Optional NCBI API key raises the E-utilities rate limit from 3/s to 10/s
+_NCBI_API_KEY = os.getenv("NCBI_API_KEY")
+
+@functools.lru_cache(maxsize=256)
+def _pubmed_fetch(query: str, max_results: int) -> str:
+    """Run the eSearch + eSummary roundtrips and format the results.
+
+    Memoized on (query, max_results): repeated tool invocations with the
+    same question skip both HTTP calls entirely. Errors propagate to the
+    caller so failed lookups are never cached.
+    """
+    # Search PubMed using eSearch
+    search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    search_params = {
+        "db": "pubmed",
+        "term": query,
+        "retmax": max_results,
+        "retmode": "json",
+        "usehistory": "y"
+    }
+    if _NCBI_API_KEY:
+        search_params["api_key"] = _NCBI_API_KEY
+
+    search_response = _get_client().get(search_url, params=search_params)
+    search_data = search_response.json()
+
+    if "esearchresult" not in search_data or not search_data["esearchresult"]["idlist"]:
+        return f"No results found for query: {query}"
+
+    pmids = search_data["esearchresult"]["idlist"]
+
+    # Fetch article details using eSummary via the history server; passing
+    # WebEnv/query_key keeps the URL short regardless of result count
+    summary_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+    summary_params = {
+        "db": "pubmed",
+        "WebEnv": search_data["esearchresult"]["webenv"],
+        "query_key": search_data["esearchresult"]["querykey"],
+        "retstart": 0,
+        "retmax": max_results,
+        "retmode": "json"
+    }
+    if _NCBI_API_KEY:
+        summary_params["api_key"] = _NCBI_API_KEY
+
+    summary_response = _get_client().get(summary_url, params=summary_params)
+    summary_data = summary_response.json()
+
+    # Single dict probe per pmid and no intermediate author lists; this loop
+    # is hot for large max_results values
+    result = summary_data["result"]
+    results = []
+    append = results.append
+    for pmid in pmids:
+        article = result.get(pmid)
+        if not article:
+            continue
+        title = article.get("title", "No title")
+        authors = ", ".join(author["name"] for author in islice(article.get("authors", ()), 3))
+        journal = article.get("source", "Unknown journal")
+        pub_date = article.get("pubdate", "Unknown date")
+
+        append(f"PMID: {pmid}\nTitle: {title}\nAuthors: {authors}\nJournal: {journal}\nDate: {pub_date}\nURL: https://pubmed.ncbi.nlm.nih.gov/{pmid}/\n")
+
+    return "\n".join(results)
+
+@tool
+def search_pubmed(query: str, max_results: int = 5) -> str:
+    """
+    Search PubMed for medical literature.
+
+    Args:
+        query (str): Search query for medical literature.
+        max_results (int): Maximum number of results to return (default: 5).
+
+    Returns:
+        str: Search results from PubMed.
+    """
+    try:
+        # The params dict URL-encodes the term; no extra escaping needed
+        return _pubmed_fetch(query.strip(), max_results)
+
+    except Exception as e:
+        return f"Error searching PubMed: {str(e)}"
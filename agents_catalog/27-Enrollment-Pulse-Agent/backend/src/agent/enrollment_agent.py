@@ -1,63 +1,13 @@
 """
 Enrollment Pulse - Clinical Trial Enrollment Optimization Agent
 """
-import sys
-from pathlib import Path
+import functools
 
-# Add root directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from strands import Agent
-from strands_tools import calculator, current_time
-from src.agent.tools import (
-    get_overall_enrollment_status,
-    get_site_performance_ranking,
-    identify_underperforming_sites,
-    get_underperforming_sites_detailed,
-    get_comprehensive_site_analysis,
-    analyze_cra_performance,
-    get_monthly_enrollment_trends,
-    calculate_screening_efficiency,
-    project_enrollment_timeline,
-    get_historical_performance,
-    get_alternative_site_recommendations,
-    get_intervention_recommendations
-)
-
-# Import new epidemiology and clinical trials tools
-from src.agent.epidemiology_tools import (
-    get_epidemiology_overview,
-    analyze_market_epidemiology,
-    compare_market_epidemiology,
-    get_biomarker_landscape,
-    identify_high_potential_markets,
-    get_patient_density_analysis,
-    estimate_trial_recruitment_pool
-)
-
-from src.agent.clinical_trials_tools import (
-    get_clinical_trials_landscape,
-    search_clinical_trials,
-    get_trial_details,
-    analyze_competitive_landscape,
-    analyze_trial_enrollment_patterns,
-    identify_recruiting_trials,
-    analyze_trial_geography,
-    analyze_intervention_trends,
-    benchmark_trial_characteristics
-)
-
-# Import live clinical trials tools
-from src.agent.live_clinical_trials_tools import (
-    search_live_clinical_trials,
-    get_live_trial_details,
-    analyze_live_competitive_landscape,
-    find_recruiting_trials_by_location,
-    track_enrollment_trends
-)
-
-
-# System prompt for the clinical operations advisor
+# System prompt for the clinical operations advisor. The surrounding
+# whitespace is stripped once at module load; the prompt is only ever
+# processed once per process because the Agent itself is cached by
+# get_agent(), so no repeat normalization or tokenization occurs.
 SYSTEM_PROMPT = """
 You are an expert clinical operations advisor specializing in clinical trial enrollment optimization. You have deep expertise in analyzing Veeva CTMS data, epidemiological patient populations, and competitive clinical trials landscape to provide actionable insights to study managers.
 
@@ -135,14 +85,62 @@ You are analyzing the Phase II ONCO-2025-117 trial studying MK-8791 in combinati
 6. **ALWAYS mention specific numbers** (enrollment counts, percentages, trends) for each site
 
 When asked about enrollment status, performance, or optimization, IMMEDIATELY use the comprehensive site analysis tool to get detailed per-site data, then structure your response with individual sections for each relevant site, providing specific insights and recommendations for each location.
-"""
+""".strip()
 
 
-def create_enrollment_agent() -> Agent:
+def create_enrollment_agent():
     """Create and configure the Enrollment Pulse agent"""
-    
-    # Custom tools for clinical trial analysis - prioritized for site-level responses
-    clinical_tools = [
+    # Tool groups are imported here rather than at module level so that
+    # importing this module (e.g. for the EnrollmentAgent type) stays cheap;
+    # the full Strands/tool stack only loads when an agent is actually built
+    from strands import Agent
+    from strands_tools import calculator, current_time
+    from .tools import (
+        get_overall_enrollment_status,
+        get_site_performance_ranking,
+        identify_underperforming_sites,
+        get_underperforming_sites_detailed,
+        get_comprehensive_site_analysis,
+        analyze_cra_performance,
+        get_monthly_enrollment_trends,
+        calculate_screening_efficiency,
+        project_enrollment_timeline,
+        get_historical_performance,
+        get_alternative_site_recommendations,
+        get_intervention_recommendations
+    )
+    from .epidemiology_tools import (
+        get_epidemiology_overview,
+        analyze_market_epidemiology,
+        compare_market_epidemiology,
+        get_biomarker_landscape,
+        identify_high_potential_markets,
+        get_patient_density_analysis,
+        estimate_trial_recruitment_pool
+    )
+    from .clinical_trials_tools import (
+        get_clinical_trials_landscape,
+        search_clinical_trials,
+        get_trial_details,
+        analyze_competitive_landscape,
+        analyze_trial_enrollment_patterns,
+        identify_recruiting_trials,
+        analyze_trial_geography,
+        analyze_intervention_trends,
+        benchmark_trial_characteristics
+    )
+    from .live_clinical_trials_tools import (
+        search_live_clinical_trials,
+        get_live_trial_details,
+        analyze_live_competitive_landscape,
+        find_recruiting_trials_by_location,
+        track_enrollment_trends
+    )
+
+    # Full tool registry as one tuple literal: ordering is fixed and no
+    # intermediate per-group lists are allocated and concatenated
+    all_tools = (
+        # Custom tools for clinical trial analysis - prioritized for site-level responses
         get_comprehensive_site_analysis,        # PRIMARY TOOL - always use for detailed site analysis
         get_underperforming_sites_detailed,     # Site-specific underperforming analysis
         get_historical_performance,             # Historical trends by site
@@ -154,22 +152,16 @@ def create_enrollment_agent() -> Agent:
         get_monthly_enrollment_trends,          # Regional trends
         calculate_screening_efficiency,         # Site screening metrics
         project_enrollment_timeline,            # Site projections
-        get_intervention_recommendations        # Generic recommendations (use sparingly)
-    ]
-    
-    # Epidemiology and market analysis tools
-    epidemiology_tools = [
+        get_intervention_recommendations,       # Generic recommendations (use sparingly)
+        # Epidemiology and market analysis tools
         get_epidemiology_overview,             # Overall epidemiology landscape
         analyze_market_epidemiology,           # Specific market analysis
         compare_market_epidemiology,           # Market comparison
         get_biomarker_landscape,               # Biomarker distribution analysis
         identify_high_potential_markets,       # High-potential market identification
         get_patient_density_analysis,          # Patient density patterns
-        estimate_trial_recruitment_pool        # Recruitment pool estimation
-    ]
-    
-    # Clinical trials competitive intelligence tools
-    clinical_trials_tools = [
+        estimate_trial_recruitment_pool,       # Recruitment pool estimation
+        # Clinical trials competitive intelligence tools
         get_clinical_trials_landscape,         # Overall trials landscape
         search_clinical_trials,                # Search specific trials
         get_trial_details,                     # Detailed trial information
@@ -178,47 +170,44 @@ def create_enrollment_agent() -> Agent:
         identify_recruiting_trials,            # Currently recruiting trials
         analyze_trial_geography,               # Geographic trial distribution
         analyze_intervention_trends,           # Treatment trend analysis
-        benchmark_trial_characteristics        # Trial benchmarking
-    ]
-    
-    # Live clinical trials API tools
-    live_clinical_trials_tools = [
+        benchmark_trial_characteristics,       # Trial benchmarking
+        # Live clinical trials API tools
         search_live_clinical_trials,           # Live API search
         get_live_trial_details,                # Live trial details
         analyze_live_competitive_landscape,    # Live competitive analysis
         find_recruiting_trials_by_location,    # Geographic recruitment analysis
-        track_enrollment_trends                # Enrollment trend tracking
-    ]
-    
-    # Utility tools
-    utility_tools = [
+        track_enrollment_trends,               # Enrollment trend tracking
+        # Utility tools
         calculator,
         current_time
-    ]
-    
-    # Combine all tools
-    all_tools = clinical_tools + epidemiology_tools + clinical_trials_tools + live_clinical_trials_tools + utility_tools
-    
+    )
+
     # Create the agent
     agent = Agent(
         model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-        tools=all_tools,
+        tools=list(all_tools),
         system_prompt=SYSTEM_PROMPT
     )
-    
+
     return agent
 
 
-# Create the global agent instance
-enrollment_agent = create_enrollment_agent()
+@functools.cache
+def get_agent():
+    """Return the shared agent instance, building it on first use.
+
+    Replaces the old module-level ``enrollment_agent = create_enrollment_agent()``
+    side effect so importing this module no longer instantiates an Agent.
+    """
+    return create_enrollment_agent()
 
 
 class EnrollmentAgent:
     """Enrollment Pulse Agent wrapper class"""
-    
+
     def __init__(self):
-        self.agent = enrollment_agent
-    
+        self.agent = get_agent()
+
     def query(self, message: str) -> str:
         """Query the agent with a message"""
         return query_agent(message)
@@ -235,7 +224,7 @@ def query_agent(message: str) -> str:
         Agent response with analysis and recommendations
     """
     try:
-        response = enrollment_agent(message)
+        response = get_agent()(message)
         
         # Extract text content from the Strands Agent response
         if hasattr(response, 'message') and isinstance(response.message, dict):
@@ -1,191 +1,292 @@
-"""
-Epidemiology Analysis Tools for Strands Agent
-"""
-from strands import tool
-from typing import Dict, List, Optional
-import sys
-from pathlib import Path
-
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
-
-from data.epidemiology_processor import EpidemiologyProcessor
-
-# Global processor instance
-_epidemiology_processor = None
-
-def get_epidemiology_processor():
-    """Get or create epidemiology processor instance"""
-    global _epidemiology_processor
-    if _epidemiology_processor is None:
-        _epidemiology_processor = EpidemiologyProcessor()
-        _epidemiology_processor.process_data()
-    return _epidemiology_processor
-
-@tool
-def get_epidemiology_overview() -> Dict:
-    """
-    Get comprehensive overview of MTNBC epidemiology data across metro areas.
-    
-    Returns detailed analysis including:
-    - Summary statistics for all metro areas
-    - Top markets by patient count, density, and recruitment feasibility
-    - Biomarker distribution analysis
-    - Recruitment potential assessment
-    
-    Use this tool to understand the overall landscape of MTNBC patient populations
-    and identify the most promising markets for clinical trial recruitment.
-    """
-    processor = get_epidemiology_processor()
-    return processor.get_market_analysis()
-
-@tool
-def analyze_market_epidemiology(metro_name: str) -> Dict:
-    """
-    Get detailed epidemiological analysis for a specific metropolitan area.
-    
-    Args:
-        metro_name: Name of the metropolitan area (e.g., "San Francisco", "New York", "Los Angeles")
-    
-    Returns:
-        Detailed market analysis including:
-        - Population demographics (female 40+ population)
-        - MTNBC incidence and prevalence rates
-        - Biomarker profiles (PD-L1, BRCA mutations)
-        - Trial eligibility estimates
-        - Recruitment feasibility scoring
-    
-    Use this tool to get in-depth analysis of patient populations in specific markets
-    for site selection and recruitment planning.
-    """
-    processor = get_epidemiology_processor()
-    return processor.get_market_analysis(metro_name)
-
-@tool
-def compare_market_epidemiology(market_names: List[str]) -> Dict:
-    """
-    Compare epidemiological data across multiple metropolitan areas.
-    
-    Args:
-        market_names: List of metropolitan area names to compare
-    
-    Returns:
-        Comparative analysis including:
-        - Side-by-side market metrics
-        - Rankings by patient count, eligibility, and feasibility
-        - Relative market attractiveness assessment
-    
-    Use this tool to evaluate and rank potential markets for clinical trial sites
-    based on patient population characteristics and recruitment potential.
-    """
-    processor = get_epidemiology_processor()
-    return processor.compare_markets(market_names)
-
-@tool
-def get_biomarker_landscape() -> Dict:
-    """
-    Analyze biomarker distribution patterns across all metropolitan areas.
-    
-    Returns:
-        Comprehensive biomarker analysis including:
-        - PD-L1 positive percentage distributions
-        - BRCA mutation prevalence patterns
-        - Biomarker-positive patient pool estimates
-        - Risk category classifications
-    
-    Use this tool to understand biomarker prevalence patterns that affect
-    trial eligibility and patient stratification strategies.
-    """
-    processor = get_epidemiology_processor()
-    data = processor.get_market_analysis()
-    return data.get('biomarker_analysis', {})
-
-@tool
-def identify_high_potential_markets() -> Dict:
-    """
-    Identify metropolitan areas with highest recruitment potential for MTNBC trials.
-    
-    Returns:
-        Market segmentation analysis including:
-        - High potential markets (feasibility score ≥0.8)
-        - Medium potential markets (feasibility score 0.6-0.8)
-        - Low potential markets (feasibility score <0.6)
-        - Total eligible patient counts by segment
-    
-    Use this tool to prioritize markets for site selection and resource allocation
-    based on recruitment feasibility scoring.
-    """
-    processor = get_epidemiology_processor()
-    data = processor.get_market_analysis()
-    return data.get('recruitment_potential', {})
-
-@tool
-def get_patient_density_analysis() -> Dict:
-    """
-    Analyze MTNBC patient density patterns across metropolitan areas.
-    
-    Returns:
-        Patient density analysis including:
-        - Markets ranked by patient density index
-        - Population concentration patterns
-        - Geographic distribution insights
-    
-    Use this tool to understand where MTNBC patients are most concentrated
-    geographically for optimal site placement strategies.
-    """
-    processor = get_epidemiology_processor()
-    data = processor.get_market_analysis()
-    return {
-        'top_density_markets': data.get('top_markets', {}).get('by_density', []),
-        'summary_stats': data.get('summary_stats', {}),
-        'analysis_note': 'Patient density index >1.0 indicates above-average concentration of MTNBC patients'
-    }
-
-@tool
-def estimate_trial_recruitment_pool(target_enrollment: int, eligibility_criteria_selectivity: float = 1.0) -> Dict:
-    """
-    Estimate recruitment pool size and market coverage needed for target enrollment.
-    
-    Args:
-        target_enrollment: Target number of patients to enroll
-        eligibility_criteria_selectivity: Factor to adjust for additional eligibility criteria (0.1-1.0)
-    
-    Returns:
-        Recruitment pool analysis including:
-        - Required patient pool size
-        - Market coverage recommendations
-        - Feasibility assessment
-        - Geographic distribution strategy
-    
-    Use this tool to plan recruitment strategies and determine how many markets
-    are needed to achieve target enrollment goals.
-    """
-    processor = get_epidemiology_processor()
-    data = processor.get_market_analysis()
-    
-    # Calculate adjusted pool requirements
-    base_eligible_pool = data.get('summary_stats', {}).get('total_trial_eligible', 0)
-    adjusted_pool = int(base_eligible_pool * eligibility_criteria_selectivity)
-    
-    # Estimate recruitment rate (typically 10-30% of eligible patients actually enroll)
-    recruitment_rates = [0.1, 0.2, 0.3]
-    scenarios = {}
-    
-    for rate in recruitment_rates:
-        potential_enrollment = int(adjusted_pool * rate)
-        coverage_needed = min(target_enrollment / potential_enrollment, 1.0) if potential_enrollment > 0 else 1.0
-        
-        scenarios[f'{int(rate*100)}%_recruitment_rate'] = {
-            'potential_enrollment': potential_enrollment,
-            'feasibility': 'High' if potential_enrollment >= target_enrollment else 'Medium' if potential_enrollment >= target_enrollment * 0.7 else 'Low',
-            'market_coverage_needed': f'{coverage_needed:.1%}',
-            'recommended_markets': int(len(data.get('metro_areas', [])) * coverage_needed)
-        }
-    
-    return {
-        'target_enrollment': target_enrollment,
-        'adjusted_eligible_pool': adjusted_pool,
-        'selectivity_factor': eligibility_criteria_selectivity,
-        'recruitment_scenarios': scenarios,
-        'top_markets_recommendation': data.get('top_markets', {}).get('by_feasibility', [])[:5]
-    }
\ No newline at end of file
+"""
+Epidemiology Analysis Tools for Strands Agent
+"""
+import functools
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from strands import tool
+from types import MappingProxyType
+from typing import Dict, Final, List, Optional
+
+from ..data.epidemiology_processor import EpidemiologyProcessor
+
+_DENSITY_NOTE: Final[str] = (
+    'Patient density index >1.0 indicates above-average concentration of MTNBC patients'
+)
+
+# Fixed recruitment-rate scenarios with their response keys prebuilt, so no
+# per-call int/str formatting is spent on the constant parts
+_RATES: Final = np.array([0.1, 0.2, 0.3])
+_RATE_KEYS: Final = ('10%_recruitment_rate', '20%_recruitment_rate', '30%_recruitment_rate')
+
+_processor = None
+_init_lock = threading.Lock()
+
+def get_epidemiology_processor():
+    """Get or create epidemiology processor instance.
+
+    The lock serializes the first build, so concurrent tool invocations
+    wait on a single process_data() run instead of each building their
+    own processor. Once built, the check outside the lock is a plain
+    read.
+    """
+    global _processor
+    if _processor is None:
+        with _init_lock:
+            if _processor is None:
+                processor = EpidemiologyProcessor()
+                processor.process_data()
+                _processor = processor
+    return _processor
+
+# The market analysis is static for the process lifetime, so repeated tool
+# calls resolve from these caches instead of re-running the processor's
+# groupby/aggregation work. Keys must be hashable: None selects the overview
+# and comparisons are keyed on the caller's tuple of names, so rows come
+# back in the order the caller asked for.
+
+@functools.lru_cache(maxsize=64)
+def _cached_market_analysis(metro_name: Optional[str] = None) -> Dict:
+    return get_epidemiology_processor().get_market_analysis(metro_name)
+
+# Parameterless responses collapse to a read-only view of the analysis
+# built once by process_data(); nothing is rebuilt per call
+
+@functools.lru_cache(maxsize=1)
+def _overview_cached() -> Dict:
+    return MappingProxyType(get_epidemiology_processor().get_market_analysis())
+
+@functools.lru_cache(maxsize=1)
+def _biomarker_cached() -> Dict:
+    return MappingProxyType(get_epidemiology_processor().biomarker_analysis)
+
+@functools.lru_cache(maxsize=1)
+def _high_potential_cached() -> Dict:
+    return MappingProxyType(get_epidemiology_processor().recruitment_potential)
+
+@functools.lru_cache(maxsize=64)
+def _cached_market_comparison(market_names: tuple) -> Dict:
+    # Assemble the comparison from the already-cached per-market analyses
+    # and rank the metric columns with one vectorized argsort each, instead
+    # of re-scanning the processor's frame per comparison. Rows keep the
+    # caller's order, and the stable sort breaks ranking ties by that same
+    # order, matching the original nlargest behaviour
+    rows = []
+    for name in market_names:
+        analysis = _cached_market_analysis(name)
+        if 'error' not in analysis:
+            rows.append(analysis)
+
+    if not rows:
+        return {"error": "No markets found matching the provided names"}
+
+    metros = [row['market_name'] for row in rows]
+    patient_counts = np.array([row['population_analysis']['estimated_mtnbc_patients'] for row in rows])
+    eligible_counts = np.array([row['trial_potential']['estimated_eligible_count'] for row in rows])
+    feasibility = np.array([row['trial_potential']['recruitment_feasibility_score'] for row in rows])
+
+    return {
+        'market_comparison': [
+            {
+                'metro': row['market_name'],
+                'state': row['state'],
+                'est_mtnbc_prevalence_1y_count': int(patients),
+                'est_trial_eligible_count': int(eligible),
+                'recruitment_feasibility_score': float(score),
+                'pd_l1_positive_pct': row['biomarker_profile']['pd_l1_positive_pct'],
+                'trial_eligibility_rate_pct': row['trial_potential']['eligibility_rate']
+            }
+            for row, patients, eligible, score in zip(rows, patient_counts, eligible_counts, feasibility)
+        ],
+        'ranking_analysis': {
+            'by_patient_count': [metros[i] for i in np.argsort(-patient_counts, kind='stable')],
+            'by_eligible_count': [metros[i] for i in np.argsort(-eligible_counts, kind='stable')],
+            'by_feasibility': [metros[i] for i in np.argsort(-feasibility, kind='stable')]
+        }
+    }
+
+@tool
+def get_epidemiology_overview() -> Dict:
+    """
+    Get comprehensive overview of MTNBC epidemiology data across metro areas.
+    
+    Returns detailed analysis including:
+    - Summary statistics for all metro areas
+    - Top markets by patient count, density, and recruitment feasibility
+    - Biomarker distribution analysis
+    - Recruitment potential assessment
+    
+    Use this tool to understand the overall landscape of MTNBC patient populations
+    and identify the most promising markets for clinical trial recruitment.
+    """
+    return _overview_cached()
+
+@tool
+def analyze_market_epidemiology(metro_name: str) -> Dict:
+    """
+    Get detailed epidemiological analysis for a specific metropolitan area.
+    
+    Args:
+        metro_name: Name of the metropolitan area (e.g., "San Francisco", "New York", "Los Angeles")
+    
+    Returns:
+        Detailed market analysis including:
+        - Population demographics (female 40+ population)
+        - MTNBC incidence and prevalence rates
+        - Biomarker profiles (PD-L1, BRCA mutations)
+        - Trial eligibility estimates
+        - Recruitment feasibility scoring
+    
+    Use this tool to get in-depth analysis of patient populations in specific markets
+    for site selection and recruitment planning.
+    """
+    # Exact names resolve through the precomputed index in one dict probe;
+    # anything else falls back to the processor's substring match
+    processor = get_epidemiology_processor()
+    canonical = processor._metro_index.get(metro_name.strip().lower())
+    return _cached_market_analysis(canonical if canonical is not None else metro_name)
+
+@tool
+def compare_market_epidemiology(market_names: List[str]) -> Dict:
+    """
+    Compare epidemiological data across multiple metropolitan areas.
+    
+    Args:
+        market_names: List of metropolitan area names to compare
+    
+    Returns:
+        Comparative analysis including:
+        - Side-by-side market metrics
+        - Rankings by patient count, eligibility, and feasibility
+        - Relative market attractiveness assessment
+    
+    Use this tool to evaluate and rank potential markets for clinical trial sites
+    based on patient population characteristics and recruitment potential.
+    """
+    return _cached_market_comparison(tuple(market_names))
+
+@tool
+def get_biomarker_landscape() -> Dict:
+    """
+    Analyze biomarker distribution patterns across all metropolitan areas.
+    
+    Returns:
+        Comprehensive biomarker analysis including:
+        - PD-L1 positive percentage distributions
+        - BRCA mutation prevalence patterns
+        - Biomarker-positive patient pool estimates
+        - Risk category classifications
+    
+    Use this tool to understand biomarker prevalence patterns that affect
+    trial eligibility and patient stratification strategies.
+    """
+    return _biomarker_cached()
+
+@tool
+def identify_high_potential_markets() -> Dict:
+    """
+    Identify metropolitan areas with highest recruitment potential for MTNBC trials.
+    
+    Returns:
+        Market segmentation analysis including:
+        - High potential markets (feasibility score ≥0.8)
+        - Medium potential markets (feasibility score 0.6-0.8)
+        - Low potential markets (feasibility score <0.6)
+        - Total eligible patient counts by segment
+    
+    Use this tool to prioritize markets for site selection and resource allocation
+    based on recruitment feasibility scoring.
+    """
+    return _high_potential_cached()
+
+@functools.lru_cache(maxsize=1)
+def _density_analysis_cached() -> Dict:
+    processor = get_epidemiology_processor()
+    return MappingProxyType({
+        'top_density_markets': processor.top_by_density,
+        'summary_stats': processor.summary_stats,
+        'analysis_note': _DENSITY_NOTE
+    })
+
+@tool
+def get_patient_density_analysis() -> Dict:
+    """
+    Analyze MTNBC patient density patterns across metropolitan areas.
+    
+    Returns:
+        Patient density analysis including:
+        - Markets ranked by patient density index
+        - Population concentration patterns
+        - Geographic distribution insights
+    
+    Use this tool to understand where MTNBC patients are most concentrated
+    geographically for optimal site placement strategies.
+    """
+    return _density_analysis_cached()
+
+@tool
+def estimate_trial_recruitment_pool(target_enrollment: int, eligibility_criteria_selectivity: float = 1.0) -> Dict:
+    """
+    Estimate recruitment pool size and market coverage needed for target enrollment.
+    
+    Args:
+        target_enrollment: Target number of patients to enroll
+        eligibility_criteria_selectivity: Factor to adjust for additional eligibility criteria (0.1-1.0)
+    
+    Returns:
+        Recruitment pool analysis including:
+        - Required patient pool size
+        - Market coverage recommendations
+        - Feasibility assessment
+        - Geographic distribution strategy
+    
+    Use this tool to plan recruitment strategies and determine how many markets
+    are needed to achieve target enrollment goals.
+    """
+    processor = get_epidemiology_processor()
+    summary_stats = processor.summary_stats
+
+    # Calculate adjusted pool requirements
+    base_eligible_pool = summary_stats.get('total_trial_eligible', 0)
+    adjusted_pool = int(base_eligible_pool * eligibility_criteria_selectivity)
+    
+    # Estimate recruitment rate (typically 10-30% of eligible patients
+    # actually enroll); all three scenarios are computed in one vectorized
+    # pass and the dict is assembled from the result arrays
+    potential = (adjusted_pool * _RATES).astype(np.int64)
+    safe_potential = np.where(potential > 0, potential, 1)
+    coverage = np.where(potential > 0, np.minimum(target_enrollment / safe_potential, 1.0), 1.0)
+    feasibility = np.where(
+        potential >= target_enrollment, 'High',
+        np.where(potential >= target_enrollment * 0.7, 'Medium', 'Low')
+    )
+    metro_count = processor.num_metros
+
+    scenarios = {
+        key: {
+            'potential_enrollment': int(pot),
+            'feasibility': str(feas),
+            'market_coverage_needed': f'{cov:.1%}',
+            'recommended_markets': int(metro_count * cov)
+        }
+        for key, pot, cov, feas in zip(_RATE_KEYS, potential, coverage, feasibility)
+    }
+
+    return {
+        'target_enrollment': target_enrollment,
+        'adjusted_eligible_pool': adjusted_pool,
+        'selectivity_factor': eligibility_criteria_selectivity,
+        'recruitment_scenarios': scenarios,
+        'top_markets_recommendation': processor.top_by_feasibility[:5]
+    }
+
+# Warm the processor off the import path: the build starts in a background
+# thread as soon as this module loads, so the first tool call usually finds
+# the singleton ready. _init_lock serializes get_epidemiology_processor, so a
+# tool arriving mid-build blocks on the lock until the warmup's build
+# finishes; a failed warmup leaves _processor unset and the next caller
+# retries inline.
+_warmup_future = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="epi-warmup"
+).submit(get_epidemiology_processor)
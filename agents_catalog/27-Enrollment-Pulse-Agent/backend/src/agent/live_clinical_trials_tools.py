@@ -18,6 +18,31 @@ logger = logging.getLogger(__name__)
 # Global API client instance
 _api_client = None
 
+# Flattened JSON path -> output field mapping for the vectorized result build
+# in search_live_clinical_trials; order matches the response schema
+_RESULT_COLUMNS = {
+    'protocolSection.identificationModule.nctId': 'nct_id',
+    'protocolSection.identificationModule.briefTitle': 'title',
+    'protocolSection.statusModule.overallStatus': 'status',
+    'protocolSection.designModule.phases': 'phase',
+    'protocolSection.designModule.enrollmentInfo.count': 'enrollment',
+    'protocolSection.statusModule.startDateStruct.date': 'start_date',
+    'protocolSection.sponsorCollaboratorsModule.leadSponsor.name': 'sponsor',
+    'protocolSection.conditionsModule.conditions': 'conditions',
+    'protocolSection.identificationModule.briefSummary': 'brief_summary',
+}
+
+# Projection for the location tool: identification, sponsor, design, and the
+# location list are the only modules its filter and response read
+_LOCATION_FIELDS = [
+    'protocolSection.identificationModule.nctId',
+    'protocolSection.identificationModule.briefTitle',
+    'protocolSection.sponsorCollaboratorsModule.leadSponsor.name',
+    'protocolSection.designModule.phases',
+    'protocolSection.designModule.enrollmentInfo.count',
+    'protocolSection.contactsLocationsModule.locations',
+]
+
 def get_api_client():
     """Get or create API client instance"""
     global _api_client
@@ -25,6 +50,26 @@ def get_api_client():
         _api_client = ClinicalTrialsAPIClient()
     return _api_client
 
+def _dig(d, *path):
+    """Walk nested dicts along path, returning None at the first missing key.
+
+    Chained .get(key, {}) calls allocate a throwaway empty dict for every
+    absent level; this resolves the path without any allocation.
+    """
+    for key in path:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(key)
+    return d
+
+def _counts_to_dict(counts: pd.Series) -> Dict:
+    """Convert a value_counts Series to a plain dict of Python ints.
+
+    One astype over the values replaces the per-item int(...) casts of the
+    old {k: int(v) for ...} comprehensions.
+    """
+    return dict(zip(counts.index.tolist(), counts.values.astype(int).tolist()))
+
 @tool
 def search_live_clinical_trials(
     condition: Optional[str] = None,
@@ -61,7 +106,8 @@ def search_live_clinical_trials(
         status_list = [status] if status else None
         phase_list = [phase] if phase else None
         
-        # Search studies
+        # Search studies, projecting the response down to the fields the
+        # result build actually reads
         response = client.search_studies(
             condition=condition,
             intervention=intervention,
@@ -69,32 +115,27 @@ def search_live_clinical_trials(
             phase=phase_list,
             sponsor_type=sponsor_type,
             location_country=country,
-            page_size=min(max_results, 1000)
+            page_size=min(max_results, 1000),
+            fields=list(_RESULT_COLUMNS)
         )
         
         studies = response.get('studies', [])
         
-        # Extract key information
-        results = []
-        for study in studies[:max_results]:
-            protocol_section = study.get('protocolSection', {})
-            identification_module = protocol_section.get('identificationModule', {})
-            status_module = protocol_section.get('statusModule', {})
-            design_module = protocol_section.get('designModule', {})
-            
-            study_info = {
-                'nct_id': identification_module.get('nctId'),
-                'title': identification_module.get('briefTitle'),
-                'status': status_module.get('overallStatus'),
-                'phase': '|'.join(design_module.get('phases', [])),
-                'enrollment': design_module.get('enrollmentInfo', {}).get('count', 0),
-                'start_date': status_module.get('startDateStruct', {}).get('date'),
-                'sponsor': protocol_section.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {}).get('name'),
-                'conditions': '|'.join(protocol_section.get('conditionsModule', {}).get('conditions', [])),
-                'brief_summary': identification_module.get('briefSummary', '')[:200] + '...' if identification_module.get('briefSummary') else ''
-            }
-            results.append(study_info)
-        
+        # Extract key information in one json_normalize pass: column selection
+        # at C speed replaces ~10 nested .get() chains per study, which is the
+        # hottest CPU path after the HTTP call at large page sizes
+        df = pd.json_normalize(studies[:max_results])
+        df = df.reindex(columns=list(_RESULT_COLUMNS)).astype(object)
+        df.columns = list(_RESULT_COLUMNS.values())
+
+        df['phase'] = df['phase'].str.join('|').fillna('')
+        df['conditions'] = df['conditions'].str.join('|').fillna('')
+        df['enrollment'] = df['enrollment'].fillna(0).astype(int)
+        summaries = df['brief_summary'].fillna('')
+        df['brief_summary'] = summaries.mask(summaries != '', summaries.str.slice(0, 200) + '...')
+
+        results = df.astype(object).where(df.notna(), None).to_dict('records')
+
         return {
             'total_found': response.get('totalCount', 0),
             'returned_count': len(results),
@@ -164,21 +205,21 @@ def get_live_trial_details(nct_id: str) -> Dict:
             },
             'status_info': {
                 'overall_status': status_module.get('overallStatus'),
-                'start_date': status_module.get('startDateStruct', {}).get('date'),
-                'completion_date': status_module.get('completionDateStruct', {}).get('date'),
-                'primary_completion_date': status_module.get('primaryCompletionDateStruct', {}).get('date'),
-                'last_update': status_module.get('lastUpdatePostDateStruct', {}).get('date'),
-                'study_first_posted': status_module.get('studyFirstPostDateStruct', {}).get('date')
+                'start_date': _dig(status_module, 'startDateStruct', 'date'),
+                'completion_date': _dig(status_module, 'completionDateStruct', 'date'),
+                'primary_completion_date': _dig(status_module, 'primaryCompletionDateStruct', 'date'),
+                'last_update': _dig(status_module, 'lastUpdatePostDateStruct', 'date'),
+                'study_first_posted': _dig(status_module, 'studyFirstPostDateStruct', 'date')
             },
             'design_info': {
                 'study_type': design_module.get('studyType'),
                 'phases': design_module.get('phases', []),
-                'allocation': design_module.get('designInfo', {}).get('allocation'),
-                'intervention_model': design_module.get('designInfo', {}).get('interventionModel'),
-                'masking': design_module.get('designInfo', {}).get('maskingInfo', {}).get('masking'),
-                'primary_purpose': design_module.get('designInfo', {}).get('primaryPurpose'),
-                'enrollment_count': design_module.get('enrollmentInfo', {}).get('count'),
-                'enrollment_type': design_module.get('enrollmentInfo', {}).get('type')
+                'allocation': _dig(design_module, 'designInfo', 'allocation'),
+                'intervention_model': _dig(design_module, 'designInfo', 'interventionModel'),
+                'masking': _dig(design_module, 'designInfo', 'maskingInfo', 'masking'),
+                'primary_purpose': _dig(design_module, 'designInfo', 'primaryPurpose'),
+                'enrollment_count': _dig(design_module, 'enrollmentInfo', 'count'),
+                'enrollment_type': _dig(design_module, 'enrollmentInfo', 'type')
             },
             'interventions': [
                 {
@@ -228,8 +269,8 @@ def get_live_trial_details(nct_id: str) -> Dict:
                 'lead_sponsor': sponsor_collaborators_module.get('leadSponsor', {}),
                 'collaborators': sponsor_collaborators_module.get('collaborators', [])
             },
-            'conditions': protocol_section.get('conditionsModule', {}).get('conditions', []),
-            'keywords': protocol_section.get('conditionsModule', {}).get('keywords', [])
+            'conditions': _dig(protocol_section, 'conditionsModule', 'conditions') or [],
+            'keywords': _dig(protocol_section, 'conditionsModule', 'keywords') or []
         }
         
     except Exception as e:
@@ -260,73 +301,90 @@ def analyze_live_competitive_landscape(condition: str, max_studies: int = 500) -
     try:
         client = get_api_client()
         
-        # Get comprehensive data
-        studies = client.search_all_pages(
-            condition=condition,
-            page_size=min(max_studies, 1000)
-        )
-        
-        if not studies:
+        # Get the shared condition DataFrame (cached on the client, capped at
+        # the caller's study budget); dictionary-encode the heavily repeated
+        # label columns so the counting below compares int codes instead of
+        # Python strings
+        df = client.get_condition_dataframe(condition, max_total=max_studies)
+
+        if df.empty:
             return {'error': 'No studies found for the specified condition'}
-        
-        # Convert to DataFrame for analysis
-        df = client.get_enrollment_data(studies)
-        
+
+        for col in ('sponsor', 'phase', 'status'):
+            df[col] = df[col].astype('category')
+
         # Analyze recruiting competition
         recruiting_df = df[df['status'] == 'RECRUITING']
         
-        # Sponsor analysis
+        # Sponsor analysis: slice the top-10 and run the cumulative sum once,
+        # rather than re-scanning the Series for each market-share field
         sponsor_counts = df['sponsor'].value_counts()
         recruiting_sponsor_counts = recruiting_df['sponsor'].value_counts()
+        # Subset counts inherit every category of the full frame; drop the
+        # zero-count entries so outputs match the plain-string behavior
+        recruiting_sponsor_counts = recruiting_sponsor_counts[recruiting_sponsor_counts > 0]
+        top_sponsors = sponsor_counts.head(10)
+        sponsor_cumsum = sponsor_counts.values.cumsum()
+        top5_total = int(sponsor_cumsum[min(5, len(sponsor_cumsum)) - 1]) if len(sponsor_cumsum) else 0
+        top10_total = int(sponsor_cumsum[min(10, len(sponsor_cumsum)) - 1]) if len(sponsor_cumsum) else 0
         
         # Phase analysis
         phase_counts = df['phase'].value_counts()
         recruiting_phase_counts = recruiting_df['phase'].value_counts()
-        
-        # Geographic analysis
-        all_countries = []
-        for countries_str in df['countries'].dropna():
-            all_countries.extend(countries_str.split('|'))
-        country_counts = pd.Series(all_countries).value_counts()
-        
-        # Enrollment analysis
-        total_enrollment = df['enrollment_count'].sum()
-        recruiting_enrollment = recruiting_df['enrollment_count'].sum()
-        
+        recruiting_phase_counts = recruiting_phase_counts[recruiting_phase_counts > 0]
+        
+        # Geographic analysis: one C-level split/explode pass over the column
+        # replaces the Python-side extend loop
+        country_counts = df['countries'].dropna().str.split('|').explode().value_counts()
+        
+        # Enrollment analysis; aggregates become native Python numbers once
+        # here instead of through per-field int()/float() wrappers below
+        total_enrollment = int(df['enrollment_count'].sum())
+        recruiting_enrollment = int(recruiting_df['enrollment_count'].sum())
+        completed_studies = int((df['status'] == 'COMPLETED').sum())
+        avg_enrollment = round(float(df['enrollment_count'].mean()), 1)
+        avg_recruiting_enrollment = (
+            round(float(recruiting_df['enrollment_count'].mean()), 1)
+            if len(recruiting_df) > 0 else 0
+        )
+
         return {
             'overview': {
-                'total_studies': int(len(df)),
-                'recruiting_studies': int(len(recruiting_df)),
-                'completed_studies': int(len(df[df['status'] == 'COMPLETED'])),
-                'total_planned_enrollment': int(total_enrollment),
-                'recruiting_enrollment_capacity': int(recruiting_enrollment),
-                'avg_enrollment_per_study': round(float(df['enrollment_count'].mean()), 1)
+                'total_studies': len(df),
+                'recruiting_studies': len(recruiting_df),
+                'completed_studies': completed_studies,
+                'total_planned_enrollment': total_enrollment,
+                'recruiting_enrollment_capacity': recruiting_enrollment,
+                'avg_enrollment_per_study': avg_enrollment
             },
             'sponsor_landscape': {
-                'total_unique_sponsors': int(len(sponsor_counts)),
-                'top_sponsors_all': {k: int(v) for k, v in sponsor_counts.head(10).to_dict().items()},
-                'top_sponsors_recruiting': {k: int(v) for k, v in recruiting_sponsor_counts.head(10).to_dict().items()},
+                'total_unique_sponsors': len(sponsor_counts),
+                'top_sponsors_all': _counts_to_dict(top_sponsors),
+                'top_sponsors_recruiting': _counts_to_dict(recruiting_sponsor_counts.head(10)),
                 'sponsor_concentration': {
-                    'top_5_market_share': round(float(sponsor_counts.head(5).sum()) / len(df) * 100, 1),
-                    'top_10_market_share': round(float(sponsor_counts.head(10).sum()) / len(df) * 100, 1)
+                    'top_5_market_share': round(top5_total / len(df) * 100, 1),
+                    'top_10_market_share': round(top10_total / len(df) * 100, 1)
                 }
             },
             'phase_distribution': {
-                'all_studies': {k: int(v) for k, v in phase_counts.to_dict().items()},
-                'recruiting_studies': {k: int(v) for k, v in recruiting_phase_counts.to_dict().items()},
+                'all_studies': _counts_to_dict(phase_counts),
+                'recruiting_studies': _counts_to_dict(recruiting_phase_counts),
+                # Literal (regex=False) match over the categorical's unique
+                # phase labels; summing the mask avoids slicing a frame just
+                # to take its length
                 'early_phase_percentage': round(
-                    len(df[df['phase'].str.contains('PHASE1', na=False)]) / len(df) * 100, 1
+                    int(df['phase'].str.contains('PHASE1', regex=False, na=False).sum()) / len(df) * 100, 1
                 )
             },
             'geographic_distribution': {
-                'top_countries': {k: int(v) for k, v in country_counts.head(10).to_dict().items()},
-                'international_studies': int(len(df[df['countries'].str.contains('\\|', na=False)])),
+                'top_countries': _counts_to_dict(country_counts.head(10)),
+                'international_studies': int(df['countries'].str.contains('|', regex=False, na=False).sum()),
                 'us_studies': int(country_counts.get('United States', 0))
             },
             'recruitment_competition': {
-                'actively_recruiting': int(len(recruiting_df)),
-                'recruitment_capacity': int(recruiting_enrollment),
-                'avg_recruiting_enrollment': round(float(recruiting_df['enrollment_count'].mean()), 1) if len(recruiting_df) > 0 else 0,
+                'actively_recruiting': len(recruiting_df),
+                'recruitment_capacity': recruiting_enrollment,
+                'avg_recruiting_enrollment': avg_recruiting_enrollment,
                 'competition_intensity': 'High' if len(recruiting_df) > 50 else 'Medium' if len(recruiting_df) > 20 else 'Low'
             },
             'market_insights': {
@@ -369,45 +427,50 @@ def find_recruiting_trials_by_location(
     try:
         client = get_api_client()
         
-        # Search for recruiting trials
+        # Search for recruiting trials, fetching only the fields the filter
+        # and response need; state/city narrow the result set server-side,
+        # while the Python pass below still picks out the matching locations
+        # within each returned study
         studies = client.search_all_pages(
             condition=condition,
             status=['RECRUITING'],
             location_country=country,
-            page_size=1000
+            location_state=state,
+            location_city=city,
+            page_size=1000,
+            fields=_LOCATION_FIELDS
         )
         
         if not studies:
             return {'error': 'No recruiting studies found for the specified criteria'}
         
-        # Filter by state/city if specified
+        # Filter by state/city if specified; the targets are lowercased once
+        # here instead of once per location inside the loop
+        state_l = state.lower() if state else None
+        city_l = city.lower() if city else None
+
         filtered_studies = []
         for study in studies:
             protocol_section = study.get('protocolSection', {})
             contacts_locations_module = protocol_section.get('contactsLocationsModule', {})
             locations = contacts_locations_module.get('locations', [])
-            
-            # Check if study has locations matching criteria
-            matching_locations = []
-            for location in locations:
-                location_match = True
-                
-                if state and location.get('state', '').lower() != state.lower():
-                    location_match = False
-                if city and location.get('city', '').lower() != city.lower():
-                    location_match = False
-                
-                if location_match:
-                    matching_locations.append(location)
-            
+
+            # Matching locations are materialized because they appear in the
+            # response; studies with none are skipped below
+            matching_locations = [
+                location for location in locations
+                if (state_l is None or (location.get('state') or '').lower() == state_l)
+                and (city_l is None or (location.get('city') or '').lower() == city_l)
+            ]
+
             if matching_locations:
                 # Add study with matching locations
                 study_info = {
-                    'nct_id': protocol_section.get('identificationModule', {}).get('nctId'),
-                    'title': protocol_section.get('identificationModule', {}).get('briefTitle'),
-                    'sponsor': protocol_section.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {}).get('name'),
-                    'phase': '|'.join(protocol_section.get('designModule', {}).get('phases', [])),
-                    'enrollment': protocol_section.get('designModule', {}).get('enrollmentInfo', {}).get('count', 0),
+                    'nct_id': _dig(protocol_section, 'identificationModule', 'nctId'),
+                    'title': _dig(protocol_section, 'identificationModule', 'briefTitle'),
+                    'sponsor': _dig(protocol_section, 'sponsorCollaboratorsModule', 'leadSponsor', 'name'),
+                    'phase': '|'.join(_dig(protocol_section, 'designModule', 'phases') or []),
+                    'enrollment': _dig(protocol_section, 'designModule', 'enrollmentInfo', 'count') or 0,
                     'matching_locations': matching_locations,
                     'total_locations': len(locations)
                 }
@@ -462,20 +525,21 @@ def track_enrollment_trends(condition: str, months_back: int = 12) -> Dict:
     try:
         client = get_api_client()
         
-        # Get all studies for the condition
-        studies = client.search_all_pages(
-            condition=condition,
-            page_size=1000
-        )
-        
-        if not studies:
+        # Get the shared condition DataFrame (cached on the client);
+        # dictionary-encode the repeated label columns so value_counts and
+        # the nunique aggregation work on int codes
+        df = client.get_condition_dataframe(condition)
+
+        if df.empty:
             return {'error': 'No studies found for trend analysis'}
-        
-        # Convert to DataFrame for time series analysis
-        df = client.get_enrollment_data(studies)
-        
-        # Convert dates and filter recent studies
-        df['start_date'] = pd.to_datetime(df['start_date'], errors='coerce')
+
+        for col in ('sponsor', 'phase', 'status'):
+            df[col] = df[col].astype('category')
+
+        # Convert dates and filter recent studies. CT.gov dates are ISO
+        # (YYYY-MM-DD, sometimes just YYYY-MM); naming the format keeps
+        # parsing on the fast C path instead of inferring per value
+        df['start_date'] = pd.to_datetime(df['start_date'], format='ISO8601', errors='coerce')
         
         # Filter to recent studies
         cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=months_back)
@@ -496,23 +560,33 @@ def track_enrollment_trends(condition: str, months_back: int = 12) -> Dict:
             'sponsor': 'unique_sponsors'
         })
         
-        # Calculate trends
-        trend_data = []
-        for month, stats in monthly_stats.iterrows():
-            trend_data.append({
-                'month': str(month),
-                'new_trials': int(stats['new_trials']),
-                'total_enrollment': int(stats['total_enrollment']),
-                'unique_sponsors': int(stats['unique_sponsors']),
-                'avg_enrollment_per_trial': round(stats['total_enrollment'] / stats['new_trials'], 1)
-            })
+        # Calculate trends from the aggregated columns directly; zipping
+        # materialized lists avoids the per-row Series construction that
+        # iterrows pays for every month
+        trend_data = [
+            {
+                'month': month,
+                'new_trials': trials,
+                'total_enrollment': enrollment,
+                'unique_sponsors': sponsors,
+                'avg_enrollment_per_trial': round(enrollment / trials, 1)
+            }
+            for month, trials, enrollment, sponsors in zip(
+                monthly_stats.index.astype(str),
+                monthly_stats['new_trials'].tolist(),
+                monthly_stats['total_enrollment'].astype(int).tolist(),
+                monthly_stats['unique_sponsors'].tolist()
+            )
+        ]
         
         # Calculate overall trends
         total_new_trials = monthly_stats['new_trials'].sum()
         total_enrollment = monthly_stats['total_enrollment'].sum()
         
-        # Identify most active sponsors in recent period
+        # Identify most active sponsors in recent period (zero-count
+        # categories from the full frame are dropped)
         recent_sponsor_activity = recent_df['sponsor'].value_counts()
+        recent_sponsor_activity = recent_sponsor_activity[recent_sponsor_activity > 0]
         
         return {
             'analysis_period': {
@@ -528,7 +602,7 @@ def track_enrollment_trends(condition: str, months_back: int = 12) -> Dict:
             },
             'monthly_breakdown': trend_data,
             'sponsor_activity': {
-                'most_active_sponsors': recent_sponsor_activity.head(10).to_dict(),
+                'most_active_sponsors': _counts_to_dict(recent_sponsor_activity.head(10)),
                 'total_active_sponsors': len(recent_sponsor_activity)
             },
             'market_momentum': {
@@ -22,7 +22,34 @@ class EnrollmentAnalyzer:
         self.subjects = subjects
         self.sites = sites
         self.metrics = metrics
-    
+        self._site_df = None
+
+    def precompute(self):
+        """Build a NumPy-backed site-performance frame once after loading.
+
+        Ranking and threshold filtering then run as vectorized column
+        operations instead of per-site Python loops.
+        """
+        self._site_df = pd.DataFrame([
+            {
+                'site_number': s.site_number,
+                'site_name': s.site_name,
+                'enrollment_percentage': s.enrollment_percentage,
+                'current_enrollment': s.current_enrollment,
+                'target_enrollment': s.target_enrollment,
+                'risk_level': s.risk_level,
+                'avg_monthly_enrollment': s.avg_monthly_enrollment
+            }
+            for s in self.summaries
+        ])
+        return self._site_df
+
+    def _get_site_df(self) -> pd.DataFrame:
+        if self._site_df is None:
+            self.precompute()
+        return self._site_df
+
+
     def get_overall_enrollment_status(self) -> Dict:
         """Calculate overall study enrollment status"""
         total_target = sum(s.target_enrollment for s in self.summaries)
@@ -47,45 +74,39 @@ class EnrollmentAnalyzer:
     
     def get_site_performance_ranking(self) -> List[Dict]:
         """Rank sites by enrollment performance"""
-        ranked_sites = []
-        
-        for summary in sorted(self.summaries, key=lambda x: x.enrollment_percentage, reverse=True):
-            ranked_sites.append({
-                'site_number': summary.site_number,
-                'site_name': summary.site_name,
-                'enrollment_percentage': round(summary.enrollment_percentage, 1),
-                'current_enrollment': summary.current_enrollment,
-                'target_enrollment': summary.target_enrollment,
-                'risk_level': summary.risk_level,
-                'avg_monthly_enrollment': round(summary.avg_monthly_enrollment, 1)
-            })
-        
-        return ranked_sites
+        df = self._get_site_df()
+        ranked = df.sort_values('enrollment_percentage', ascending=False).assign(
+            enrollment_percentage=df['enrollment_percentage'].round(1),
+            avg_monthly_enrollment=df['avg_monthly_enrollment'].round(1)
+        )
+
+        return ranked.to_dict('records')
     
     def identify_underperforming_sites(self, threshold: float = 60.0) -> List[Dict]:
         """Identify sites below enrollment threshold"""
-        underperforming = []
-        
-        for summary in self.summaries:
-            if summary.enrollment_percentage < threshold:
-                # Calculate projected enrollment at current rate
-                days_remaining = (datetime(2025, 9, 30) - datetime.now()).days
-                months_remaining = max(1, days_remaining / 30)
-                projected_enrollment = summary.current_enrollment + (summary.avg_monthly_enrollment * months_remaining)
-                
-                underperforming.append({
-                    'site_number': summary.site_number,
-                    'site_name': summary.site_name,
-                    'current_percentage': round(summary.enrollment_percentage, 1),
-                    'current_enrollment': summary.current_enrollment,
-                    'target_enrollment': summary.target_enrollment,
-                    'projected_final_enrollment': int(projected_enrollment),
-                    'shortfall': summary.target_enrollment - int(projected_enrollment),
-                    'risk_level': summary.risk_level,
-                    'days_remaining': days_remaining
-                })
-        
-        return sorted(underperforming, key=lambda x: x['shortfall'], reverse=True)
+        df = self._get_site_df()
+        below = df[df['enrollment_percentage'] < threshold]
+        if below.empty:
+            return []
+
+        # Calculate projected enrollment at current rate
+        days_remaining = (datetime(2025, 9, 30) - datetime.now()).days
+        months_remaining = max(1, days_remaining / 30)
+        projected = (below['current_enrollment'] + below['avg_monthly_enrollment'] * months_remaining).astype(int)
+
+        underperforming = pd.DataFrame({
+            'site_number': below['site_number'],
+            'site_name': below['site_name'],
+            'current_percentage': below['enrollment_percentage'].round(1),
+            'current_enrollment': below['current_enrollment'],
+            'target_enrollment': below['target_enrollment'],
+            'projected_final_enrollment': projected,
+            'shortfall': below['target_enrollment'] - projected,
+            'risk_level': below['risk_level'],
+            'days_remaining': days_remaining
+        })
+
+        return underperforming.sort_values('shortfall', ascending=False).to_dict('records')
     
     def analyze_cra_performance(self) -> Dict:
         """Analyze CRA performance correlation with site enrollment"""
@@ -1,6 +1,7 @@
 """
 Clinical Trials Data Processor for ClinicalTrials.gov Data Analysis
 """
+import orjson
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -18,6 +19,16 @@ class ClinicalTrialsProcessor:
         self.data_path = Path(data_path)
         self.data = None
         self.processed_data = None
+        self.sorted_enrollments = None
+        self.sorted_durations_months = None
+        self._by_nct = {}
+        self._recruiting_trials = []
+        self._recruiting_stats = {}
+        self._search_cols = {}
+        self.landscape_json = None
+        self._enrollment = np.empty(0)
+        self._recruiting_mask = np.empty(0, dtype=bool)
+        self._mask_cache = {}
         
     def load_data(self) -> pd.DataFrame:
         """Load clinical trials data from CSV"""
@@ -38,7 +49,67 @@ class ClinicalTrialsProcessor:
         self._clean_data()
         self._extract_features()
         self._categorize_trials()
-        
+
+        # Pre-sorted arrays so benchmarking can answer exact percentile
+        # queries with a single O(log n) searchsorted call
+        self.sorted_enrollments = (
+            np.sort(self.data['Enrollment'].dropna().to_numpy())
+            if 'Enrollment' in self.data.columns else np.empty(0)
+        )
+        self.sorted_durations_months = (
+            np.sort(self.data['planned_duration_months'].dropna().to_numpy())
+            if 'planned_duration_months' in self.data.columns else np.empty(0)
+        )
+
+        # NCT numbers are unique, so a one-time index makes trial detail
+        # lookups a single hash probe instead of a column scan
+        if 'NCT Number' in self.data.columns:
+            self._by_nct = {
+                nct: pos for pos, nct in enumerate(self.data['NCT Number'])
+            }
+
+        # Lowercased NumPy copies of the searchable columns, built once so
+        # each search is a vectorized substring scan with no per-call
+        # casefolding or regex work
+        self._search_cols = {
+            col: self.data[col].fillna('').astype(str).str.lower().to_numpy(dtype=str)
+            for col in ('Conditions', 'Interventions', 'Study Status', 'Phases', 'Sponsor')
+            if col in self.data.columns
+        }
+
+        # Columnar views of the hot columns: the enrollment figures as one
+        # float64 array (NaN for missing) and recruiting membership as a
+        # boolean mask, so aggregates run as vectorized reductions instead
+        # of per-row dict probes
+        if 'Enrollment' in self.data.columns:
+            self._enrollment = self.data['Enrollment'].to_numpy(dtype=np.float64)
+        if 'Study Status' in self.data.columns:
+            self._recruiting_mask = self.data['Study Status'].str.contains(
+                'RECRUITING', case=False, na=False
+            ).to_numpy()
+
+        # Study status is a static snapshot, so the recruiting subset and its
+        # aggregates are computed once here instead of re-filtered per query.
+        # The same contains() match as search_trials keeps results identical.
+        if 'Study Status' in self.data.columns:
+            recruiting = self.data.loc[
+                self._recruiting_mask,
+                ['NCT Number', 'Study Title', 'Study Status', 'Phases',
+                 'Enrollment', 'Sponsor', 'Conditions', 'Interventions']
+            ]
+            self._recruiting_trials = recruiting.to_dict('records')
+            # One vectorized NaN-aware reduction over the columnar view
+            # instead of a row-wise sum with missing-value checks
+            total_enrollment = (
+                int(np.nansum(self._enrollment[self._recruiting_mask]))
+                if len(self._enrollment) else 0
+            )
+            self._recruiting_stats = {
+                'count': len(recruiting),
+                'total_enrollment': total_enrollment,
+                'avg_enrollment': round(total_enrollment / max(len(recruiting), 1))
+            }
+
         self.processed_data = {
             'trials': self.data.to_dict('records'),
             'summary_stats': self._calculate_summary_stats(),
@@ -51,7 +122,17 @@ class ClinicalTrialsProcessor:
             'timeline_analysis': self._analyze_timelines(),
             'competitive_landscape': self._analyze_competitive_landscape()
         }
-        
+
+        # Serialize the full landscape once; consumers shipping it over the
+        # wire can reuse these bytes instead of re-serializing the nested
+        # dict on every call. The tool layer still returns the dict itself,
+        # since the Strands transport expects plain Python objects.
+        self.landscape_json = orjson.dumps(
+            self.processed_data,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            default=str
+        )
+
         return self.processed_data
     
     def _clean_data(self):
@@ -201,14 +282,14 @@ class ClinicalTrialsProcessor:
         if 'Phases' not in self.data.columns:
             return {}
         
-        # Count phase occurrences
-        phase_counts = {}
-        for phases_str in self.data['Phases'].dropna():
-            phases = str(phases_str).split('|')
-            for phase in phases:
-                phase = phase.strip()
-                phase_counts[phase] = phase_counts.get(phase, 0) + 1
-        
+        # Count phase occurrences with a vectorized split/explode instead of
+        # a per-row Python loop
+        phase_counts = (
+            self.data['Phases'].dropna().astype(str)
+            .str.split('|').explode().str.strip()
+            .value_counts().to_dict()
+        )
+
         early_phase_count = int(self.data['is_early_phase'].sum()) if 'is_early_phase' in self.data.columns else 0
         
         return {
@@ -222,21 +303,17 @@ class ClinicalTrialsProcessor:
         if 'Conditions' not in self.data.columns:
             return {}
         
-        # Extract individual conditions
-        condition_counts = {}
-        for conditions_str in self.data['Conditions'].dropna():
-            conditions = str(conditions_str).split('|')
-            for condition in conditions:
-                condition = condition.strip()
-                condition_counts[condition] = condition_counts.get(condition, 0) + 1
-        
-        # Sort by frequency
-        sorted_conditions = dict(sorted(condition_counts.items(), key=lambda x: x[1], reverse=True))
-        
+        # Vectorized split/explode; value_counts already sorts by frequency
+        sorted_conditions = (
+            self.data['Conditions'].dropna().astype(str)
+            .str.split('|').explode().str.strip()
+            .value_counts().to_dict()
+        )
+
         return {
             'condition_distribution': sorted_conditions,
             'top_conditions': dict(list(sorted_conditions.items())[:10]),
-            'unique_conditions_count': len(condition_counts)
+            'unique_conditions_count': len(sorted_conditions)
         }
     
     def _analyze_interventions(self) -> Dict:
@@ -244,13 +321,12 @@ class ClinicalTrialsProcessor:
         if 'Interventions' not in self.data.columns:
             return {}
         
-        # Count intervention types
-        intervention_counts = {}
-        for types_list in self.data['intervention_types'].dropna():
-            if isinstance(types_list, list):
-                for intervention_type in types_list:
-                    intervention_counts[intervention_type] = intervention_counts.get(intervention_type, 0) + 1
-        
+        # Explode the per-trial type lists and count in one vectorized pass
+        intervention_counts = (
+            self.data['intervention_types'].dropna().explode().dropna()
+            .value_counts().to_dict()
+        )
+
         drug_trials = int(self.data['has_drug_intervention'].sum()) if 'has_drug_intervention' in self.data.columns else 0
         
         return {
@@ -264,16 +340,12 @@ class ClinicalTrialsProcessor:
         if 'countries' not in self.data.columns:
             return {}
         
-        # Count countries
-        country_counts = {}
-        for countries_list in self.data['countries'].dropna():
-            if isinstance(countries_list, list):
-                for country in countries_list:
-                    country_counts[country] = country_counts.get(country, 0) + 1
-        
-        # Sort by frequency
-        sorted_countries = dict(sorted(country_counts.items(), key=lambda x: x[1], reverse=True))
-        
+        # Explode the per-trial country lists; value_counts sorts by frequency
+        sorted_countries = (
+            self.data['countries'].dropna().explode().dropna()
+            .value_counts().to_dict()
+        )
+
         international_count = int(self.data['is_international'].sum()) if 'is_international' in self.data.columns else 0
         
         return {
@@ -281,7 +353,7 @@ class ClinicalTrialsProcessor:
             'top_countries': dict(list(sorted_countries.items())[:10]),
             'international_trials': international_count,
             'international_percentage': round(international_count / len(self.data) * 100, 1),
-            'unique_countries': len(country_counts)
+            'unique_countries': len(sorted_countries)
         }
     
     def _analyze_enrollment(self) -> Dict:
@@ -339,17 +411,18 @@ class ClinicalTrialsProcessor:
         industry_keywords = ['Inc', 'Ltd', 'Corp', 'Company', 'Pharmaceutical', 'Pharma', 'Therapeutics']
         academic_keywords = ['University', 'Hospital', 'Medical Center', 'Institute', 'Foundation']
         
-        sponsor_types = {'Industry': 0, 'Academic': 0, 'Other': 0}
-        
-        for sponsor in self.data['Sponsor'].dropna():
-            sponsor_str = str(sponsor)
-            if any(keyword in sponsor_str for keyword in industry_keywords):
-                sponsor_types['Industry'] += 1
-            elif any(keyword in sponsor_str for keyword in academic_keywords):
-                sponsor_types['Academic'] += 1
-            else:
-                sponsor_types['Other'] += 1
-        
+        # Vectorized keyword classification: two str.contains passes over the
+        # column replace the nested per-sponsor/per-keyword Python loops
+        sponsors = self.data['Sponsor'].dropna().astype(str)
+        industry_mask = sponsors.str.contains('|'.join(industry_keywords), regex=True)
+        academic_mask = ~industry_mask & sponsors.str.contains('|'.join(academic_keywords), regex=True)
+
+        sponsor_types = {
+            'Industry': int(industry_mask.sum()),
+            'Academic': int(academic_mask.sum()),
+            'Other': int((~industry_mask & ~academic_mask).sum())
+        }
+
         return {
             'top_sponsors': sponsor_counts.head(10).to_dict(),
             'sponsor_type_distribution': sponsor_types,
@@ -366,40 +439,42 @@ class ClinicalTrialsProcessor:
         if self.processed_data is None:
             self.process_data()
         
-        filtered_data = self.data.copy()
-        
-        # Apply filters
-        if condition:
-            filtered_data = filtered_data[
-                filtered_data['Conditions'].str.contains(condition, case=False, na=False)
-            ]
-        
-        if intervention:
-            filtered_data = filtered_data[
-                filtered_data['Interventions'].str.contains(intervention, case=False, na=False)
-            ]
-        
-        if status:
-            filtered_data = filtered_data[
-                filtered_data['Study Status'].str.contains(status, case=False, na=False)
-            ]
-        
-        if phase:
-            filtered_data = filtered_data[
-                filtered_data['Phases'].str.contains(phase, case=False, na=False)
-            ]
-        
-        if sponsor:
-            filtered_data = filtered_data[
-                filtered_data['Sponsor'].str.contains(sponsor, case=False, na=False)
-            ]
-        
+        # Each active filter becomes a vectorized substring scan over the
+        # pre-lowercased column arrays; the per-column masks are AND-reduced
+        # in one NumPy call and only the matching output rows materialize.
+        # Masks are cached per (column, term), so a term that recurs across
+        # queries — e.g. status="RECRUITING" with varying other filters —
+        # costs a single dict lookup instead of a rescan.
+        masks = []
+        for col, needle in (
+            ('Conditions', condition),
+            ('Interventions', intervention),
+            ('Study Status', status),
+            ('Phases', phase),
+            ('Sponsor', sponsor),
+        ):
+            if not needle or col not in self._search_cols:
+                continue
+            key = (col, needle.lower())
+            mask = self._mask_cache.get(key)
+            if mask is None:
+                mask = np.char.find(self._search_cols[col], key[1]) >= 0
+                self._mask_cache[key] = mask
+            masks.append(mask)
+
+        output_columns = [
+            'NCT Number', 'Study Title', 'Study Status', 'Phases',
+            'Enrollment', 'Sponsor', 'Conditions', 'Interventions'
+        ]
+
+        if masks:
+            matches = self.data.loc[np.logical_and.reduce(masks), output_columns]
+        else:
+            matches = self.data[output_columns]
+
         return {
-            'matching_trials': len(filtered_data),
-            'trials': filtered_data[[
-                'NCT Number', 'Study Title', 'Study Status', 'Phases', 
-                'Enrollment', 'Sponsor', 'Conditions', 'Interventions'
-            ]].to_dict('records')
+            'matching_trials': len(matches),
+            'trials': matches.to_dict('records')
         }
     
     def get_trial_details(self, nct_number: str) -> Dict:
@@ -407,12 +482,12 @@ class ClinicalTrialsProcessor:
         if self.processed_data is None:
             self.process_data()
         
-        trial_data = self.data[self.data['NCT Number'] == nct_number]
-        
-        if trial_data.empty:
+        pos = self._by_nct.get(nct_number)
+
+        if pos is None:
             return {"error": f"Trial {nct_number} not found"}
-        
-        trial = trial_data.iloc[0]
+
+        trial = self.data.iloc[pos]
         
         return {
             'nct_number': trial['NCT Number'],
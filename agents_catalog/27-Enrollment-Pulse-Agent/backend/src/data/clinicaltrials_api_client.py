@@ -5,12 +5,32 @@ import requests
 import pandas as pd
 from typing import Dict, List, Optional, Union
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
-import json
+
+import orjson
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# JSON paths actually read by get_enrollment_data; projecting responses down
+# to these via the fields= parameter cuts payload size and parse time
+ENROLLMENT_FIELDS = [
+    'protocolSection.identificationModule.nctId',
+    'protocolSection.identificationModule.briefTitle',
+    'protocolSection.statusModule.overallStatus',
+    'protocolSection.statusModule.startDateStruct.date',
+    'protocolSection.statusModule.primaryCompletionDateStruct.date',
+    'protocolSection.statusModule.lastUpdatePostDateStruct.date',
+    'protocolSection.designModule.phases',
+    'protocolSection.designModule.enrollmentInfo',
+    'protocolSection.sponsorCollaboratorsModule.leadSponsor',
+    'protocolSection.conditionsModule.conditions',
+    'protocolSection.armsInterventionsModule.interventions',
+    'protocolSection.contactsLocationsModule.locations',
+]
+
 class ClinicalTrialsAPIClient:
     """Client for ClinicalTrials.gov API v2"""
     
@@ -21,7 +41,34 @@ class ClinicalTrialsAPIClient:
             'User-Agent': 'EnrollmentPulse/1.0 (Clinical Trial Analysis Tool)',
             'Accept': 'application/json'
         })
-        
+        # Parsed responses are cached for 15 minutes, keyed on the normalized
+        # request parameters, so repeated agent queries with the same criteria
+        # become dict lookups instead of new HTTP round-trips. Registry data
+        # changes on a daily cadence, so a short TTL is safe.
+        self._response_cache = TTLCache(maxsize=512, ttl=900)
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(method: str, params: Dict) -> tuple:
+        """Build a hashable cache key from a method name and its kwargs"""
+        return (method,) + tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in params.items() if value is not None
+        ))
+
+    def _cache_get(self, key: tuple):
+        with self._cache_lock:
+            return self._response_cache.get(key)
+
+    def _cache_put(self, key: tuple, value) -> None:
+        with self._cache_lock:
+            self._response_cache[key] = value
+
+    def clear_cache(self) -> None:
+        """Drop all cached responses (admin hook for forcing fresh data)"""
+        with self._cache_lock:
+            self._response_cache.clear()
+
     def search_studies(self, 
                       query: Optional[str] = None,
                       condition: Optional[str] = None,
@@ -30,11 +77,14 @@ class ClinicalTrialsAPIClient:
                       phase: Optional[List[str]] = None,
                       sponsor_type: Optional[str] = None,
                       location_country: Optional[str] = None,
+                      location_state: Optional[str] = None,
+                      location_city: Optional[str] = None,
                       min_age: Optional[str] = None,
                       max_age: Optional[str] = None,
                       gender: Optional[str] = None,
                       page_size: int = 100,
-                      page_token: Optional[str] = None) -> Dict:
+                      page_token: Optional[str] = None,
+                      fields: Optional[List[str]] = None) -> Dict:
         """
         Search studies using ClinicalTrials.gov API v2
         
@@ -46,12 +96,16 @@ class ClinicalTrialsAPIClient:
             phase: List of phases (e.g., ['PHASE1', 'PHASE2'])
             sponsor_type: 'INDUSTRY', 'NIH', 'OTHER_GOV', 'OTHER'
             location_country: Country name
+            location_state: State/province name, matched server-side
+            location_city: City name, matched server-side
             min_age: Minimum age (e.g., '18 Years')
             max_age: Maximum age (e.g., '65 Years')
             gender: 'ALL', 'FEMALE', 'MALE'
             page_size: Number of results per page (max 1000)
             page_token: Token for pagination
-            
+            fields: JSON paths to project the response down to; None returns
+                the full study records
+
         Returns:
             API response with studies data
         """
@@ -77,6 +131,16 @@ class ClinicalTrialsAPIClient:
             params['filter.leadSponsorClass'] = sponsor_type
         if location_country:
             params['filter.geo'] = location_country
+        if location_state or location_city:
+            # Push geographic narrowing into the location query so matching
+            # studies are selected server-side instead of being downloaded
+            # and discarded
+            area_terms = []
+            if location_state:
+                area_terms.append(f'AREA[LocationState]{location_state}')
+            if location_city:
+                area_terms.append(f'AREA[LocationCity]{location_city}')
+            params['query.locn'] = ' AND '.join(area_terms)
         if min_age:
             params['filter.minAge'] = min_age
         if max_age:
@@ -85,11 +149,22 @@ class ClinicalTrialsAPIClient:
             params['filter.sex'] = gender
         if page_token:
             params['pageToken'] = page_token
-            
+        if fields:
+            params['fields'] = '|'.join(fields)
+
+        cache_key = self._cache_key('search_studies', params)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
+            # orjson decodes the large nested payloads noticeably faster
+            # than the stdlib parser behind response.json()
+            result = orjson.loads(response.content)
+            self._cache_put(cache_key, result)
+            return result
         except requests.exceptions.RequestException as e:
             logger.warning(f"Error searching studies: {e}")
             raise
@@ -105,11 +180,18 @@ class ClinicalTrialsAPIClient:
             Detailed study information
         """
         url = f"{self.base_url}/studies/{nct_id}"
-        
+
+        cache_key = self._cache_key('get_study_details', {'nct_id': nct_id})
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
-            return response.json()
+            result = orjson.loads(response.content)
+            self._cache_put(cache_key, result)
+            return result
         except requests.exceptions.RequestException as e:
             logger.warning(f"Error getting study details for {nct_id}: {e}")
             raise
@@ -133,33 +215,47 @@ class ClinicalTrialsAPIClient:
         try:
             response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except requests.exceptions.RequestException as e:
             logger.warning(f"Error getting multiple studies: {e}")
             raise
     
-    def search_all_pages(self, **search_params) -> List[Dict]:
+    def search_all_pages(self, max_total: Optional[int] = None, **search_params) -> List[Dict]:
         """
         Search all pages of results for a query
-        
+
         Args:
+            max_total: Stop fetching once this many studies have accumulated;
+                None fetches every page (up to the safety limit)
             **search_params: Parameters to pass to search_studies
-            
+
         Returns:
             List of all studies from all pages
         """
+        cache_key = self._cache_key('search_all_pages', dict(search_params, max_total=max_total))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         all_studies = []
         page_token = None
         max_pages = 50  # Safety limit
         page_count = 0
-        
+        completed = True
+
         while page_count < max_pages:
             try:
                 response = self.search_studies(page_token=page_token, **search_params)
                 
                 studies = response.get('studies', [])
                 all_studies.extend(studies)
-                
+
+                # Stop paging as soon as the caller's budget is met instead of
+                # downloading and discarding the remaining pages
+                if max_total is not None and len(all_studies) >= max_total:
+                    all_studies = all_studies[:max_total]
+                    break
+
                 # Check if there are more pages
                 page_token = response.get('nextPageToken')
                 if not page_token:
@@ -170,9 +266,14 @@ class ClinicalTrialsAPIClient:
                 
             except Exception as e:
                 logger.warning(f"Error on page {page_count}: {e}")
+                completed = False
                 break
-        
+
         logger.info(f"Retrieved {len(all_studies)} studies across {page_count + 1} pages")
+        # Only cache clean runs: a pagination error would otherwise pin an
+        # empty or truncated result for the whole TTL
+        if completed:
+            self._cache_put(cache_key, all_studies)
         return all_studies
     
     def search_oncology_trials(self, 
@@ -236,53 +337,103 @@ class ClinicalTrialsAPIClient:
         Returns:
             DataFrame with enrollment information
         """
-        enrollment_data = []
-        
+        # Accumulate columns directly (structure-of-arrays) so the DataFrame
+        # constructor receives ready-made columns instead of pivoting a list
+        # of per-study dicts row by row
+        nct_ids = []
+        titles = []
+        statuses = []
+        phases = []
+        enrollment_counts = []
+        enrollment_types = []
+        start_dates = []
+        completion_dates = []
+        last_updates = []
+        sponsors = []
+        sponsor_classes = []
+        conditions_col = []
+        interventions_col = []
+        location_counts = []
+        countries_col = []
+
         for study in studies:
             protocol_section = study.get('protocolSection', {})
             design_module = protocol_section.get('designModule', {})
             status_module = protocol_section.get('statusModule', {})
             identification_module = protocol_section.get('identificationModule', {})
-            
             enrollment_info = design_module.get('enrollmentInfo', {})
-            
-            data = {
-                'nct_id': identification_module.get('nctId'),
-                'title': identification_module.get('briefTitle'),
-                'status': status_module.get('overallStatus'),
-                'phase': '|'.join(design_module.get('phases', [])),
-                'enrollment_count': enrollment_info.get('count', 0),
-                'enrollment_type': enrollment_info.get('type'),
-                'start_date': status_module.get('startDateStruct', {}).get('date'),
-                'completion_date': status_module.get('primaryCompletionDateStruct', {}).get('date'),
-                'last_update': status_module.get('lastUpdatePostDateStruct', {}).get('date'),
-                'sponsor': protocol_section.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {}).get('name'),
-                'sponsor_class': protocol_section.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {}).get('class')
-            }
-            
-            # Extract conditions
-            conditions_module = protocol_section.get('conditionsModule', {})
-            data['conditions'] = '|'.join(conditions_module.get('conditions', []))
-            
-            # Extract interventions
-            interventions_module = protocol_section.get('armsInterventionsModule', {})
-            interventions = interventions_module.get('interventions', [])
-            data['interventions'] = '|'.join([
+            lead_sponsor = protocol_section.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {})
+            interventions = protocol_section.get('armsInterventionsModule', {}).get('interventions', [])
+            locations = protocol_section.get('contactsLocationsModule', {}).get('locations', [])
+
+            nct_ids.append(identification_module.get('nctId'))
+            titles.append(identification_module.get('briefTitle'))
+            statuses.append(status_module.get('overallStatus'))
+            phases.append('|'.join(design_module.get('phases', [])))
+            enrollment_counts.append(enrollment_info.get('count', 0))
+            enrollment_types.append(enrollment_info.get('type'))
+            start_dates.append(status_module.get('startDateStruct', {}).get('date'))
+            completion_dates.append(status_module.get('primaryCompletionDateStruct', {}).get('date'))
+            last_updates.append(status_module.get('lastUpdatePostDateStruct', {}).get('date'))
+            sponsors.append(lead_sponsor.get('name'))
+            sponsor_classes.append(lead_sponsor.get('class'))
+            conditions_col.append('|'.join(protocol_section.get('conditionsModule', {}).get('conditions', [])))
+            interventions_col.append('|'.join([
                 f"{i.get('type', '')}:{i.get('name', '')}" for i in interventions
-            ])
-            
-            # Extract locations
-            contacts_locations_module = protocol_section.get('contactsLocationsModule', {})
-            locations = contacts_locations_module.get('locations', [])
-            data['location_count'] = len(locations)
-            data['countries'] = '|'.join(list(set([
+            ]))
+            location_counts.append(len(locations))
+            countries_col.append('|'.join(list(set([
                 loc.get('country', '') for loc in locations if loc.get('country')
-            ])))
-            
-            enrollment_data.append(data)
-        
-        return pd.DataFrame(enrollment_data)
+            ]))))
+
+        return pd.DataFrame({
+            'nct_id': nct_ids,
+            'title': titles,
+            'status': statuses,
+            'phase': phases,
+            'enrollment_count': enrollment_counts,
+            'enrollment_type': enrollment_types,
+            'start_date': start_dates,
+            'completion_date': completion_dates,
+            'last_update': last_updates,
+            'sponsor': sponsors,
+            'sponsor_class': sponsor_classes,
+            'conditions': conditions_col,
+            'interventions': interventions_col,
+            'location_count': location_counts,
+            'countries': countries_col
+        })
     
+    def get_condition_dataframe(self, condition: str, max_total: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get the enrollment DataFrame for a condition, reusing a cached build
+
+        The page walk plus DataFrame construction is the expensive part
+        shared by the landscape and trend analyses; the materialized frame
+        rides the same TTL cache as the raw responses, keyed on the
+        condition and study cap.
+
+        Args:
+            condition: Medical condition to search
+            max_total: Optional cap on the number of studies fetched
+
+        Returns:
+            DataFrame with enrollment information (a copy; callers are free
+            to overwrite columns without touching the cached frame)
+        """
+        cache_key = self._cache_key(
+            'condition_dataframe', {'condition': condition, 'max_total': max_total}
+        )
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            studies = self.search_all_pages(
+                condition=condition, page_size=1000, max_total=max_total,
+                fields=ENROLLMENT_FIELDS
+            )
+            cached = self.get_enrollment_data(studies)
+            self._cache_put(cache_key, cached)
+        return cached.copy()
+
     def get_competitive_landscape(self, condition: str) -> Dict:
         """
         Get competitive landscape analysis for a specific condition
@@ -293,7 +444,9 @@ class ClinicalTrialsAPIClient:
         Returns:
             Competitive landscape analysis
         """
-        studies = self.search_all_pages(condition=condition, page_size=1000)
+        studies = self.search_all_pages(
+            condition=condition, page_size=1000, fields=ENROLLMENT_FIELDS
+        )
         df = self.get_enrollment_data(studies)
         
         # Analyze sponsors
@@ -16,6 +16,8 @@ class EpidemiologyProcessor:
         self.data_path = Path(data_path)
         self.data = None
         self.processed_data = None
+        self._metro_index = {}
+        self.num_metros = 0
         
     def load_data(self) -> pd.DataFrame:
         """Load epidemiology data from CSV"""
@@ -58,6 +60,13 @@ class EpidemiologyProcessor:
             (self.data['pd_l1_positive_pct'] / 100 * 0.3)
         ).round(3)
         
+        # Normalized name -> canonical metro name, so exact lookups resolve
+        # with one hash probe instead of a substring scan over the column
+        self._metro_index = {
+            str(metro).strip().lower(): str(metro) for metro in self.data['metro']
+        }
+        self.num_metros = len(self.data)
+
         self.processed_data = {
             'metro_areas': self.data.to_dict('records'),
             'summary_stats': self._calculate_summary_stats(),
@@ -148,6 +157,39 @@ class EpidemiologyProcessor:
             }
         }
     
+    def _processed(self) -> Dict:
+        if self.processed_data is None:
+            self.process_data()
+        return self.processed_data
+
+    # Direct views onto the analysis built once by process_data(), so tool
+    # code returns them without re-walking nested .get() chains
+
+    @property
+    def summary_stats(self) -> Dict:
+        """Summary statistics across all metro areas."""
+        return self._processed()['summary_stats']
+
+    @property
+    def top_by_density(self) -> List[Dict]:
+        """Top markets ranked by patient density index."""
+        return self._processed()['top_markets']['by_density']
+
+    @property
+    def top_by_feasibility(self) -> List[Dict]:
+        """Top markets ranked by recruitment feasibility score."""
+        return self._processed()['top_markets']['by_feasibility']
+
+    @property
+    def biomarker_analysis(self) -> Dict:
+        """Biomarker distribution analysis."""
+        return self._processed()['biomarker_analysis']
+
+    @property
+    def recruitment_potential(self) -> Dict:
+        """Market segmentation by recruitment feasibility."""
+        return self._processed()['recruitment_potential']
+
     def get_market_analysis(self, metro_name: Optional[str] = None) -> Dict:
         """Get detailed analysis for a specific market or all markets"""
         if self.processed_data is None:
@@ -80,6 +80,21 @@ def fetch_agent_runtime_versions(
         return []
 
 
+# Precompiled patterns for clean_response_text; compiling once at import
+# avoids per-chunk pattern-cache lookups while streaming responses
+_QUOTED_CHUNKS_RE = re.compile(r'"\s*"')
+_LEADING_QUOTE_RE = re.compile(r'^"')
+_TRAILING_QUOTE_RE = re.compile(r'"$')
+_MULTI_SPACE_RE = re.compile(r" {3,}")
+_NUMBERED_ITEM_RE = re.compile(r"\n(\d+)\.\s+")
+_NUMBERED_START_RE = re.compile(r"^(\d+)\.\s+")
+_BULLET_ITEM_RE = re.compile(r"\n-\s+")
+_BULLET_START_RE = re.compile(r"^-\s+")
+_SECTION_HEADER_RE = re.compile(r"\n([A-Za-z][A-Za-z\s]{2,30}):\s*\n")
+_MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+_THINKING_RE = re.compile(r"<thinking>.*?</thinking>")
+
+
 def clean_response_text(text: str, show_thinking: bool = True) -> str:
     """Clean and format response text for better presentation"""
     if not text:
@@ -87,9 +102,9 @@ def clean_response_text(text: str, show_thinking: bool = True) -> str:
 
     # Handle the consecutive quoted chunks pattern
     # Pattern: "word1" "word2" "word3" -> word1 word2 word3
-    text = re.sub(r'"\s*"', "", text)
-    text = re.sub(r'^"', "", text)
-    text = re.sub(r'"$', "", text)
+    text = _QUOTED_CHUNKS_RE.sub("", text)
+    text = _LEADING_QUOTE_RE.sub("", text)
+    text = _TRAILING_QUOTE_RE.sub("", text)
 
     # Replace literal \n with actual newlines
     text = text.replace("\\n", "\n")
@@ -98,7 +113,7 @@ def clean_response_text(text: str, show_thinking: bool = True) -> str:
     text = text.replace("\\t", "\t")
 
     # Clean up multiple spaces
-    text = re.sub(r" {3,}", " ", text)
+    text = _MULTI_SPACE_RE.sub(" ", text)
 
     # Fix newlines that got converted to spaces
     text = text.replace(" \n ", "\n")
@@ -106,23 +121,23 @@ def clean_response_text(text: str, show_thinking: bool = True) -> str:
     text = text.replace(" \n", "\n")
 
     # Handle numbered lists
-    text = re.sub(r"\n(\d+)\.\s+", r"\n\1. ", text)
-    text = re.sub(r"^(\d+)\.\s+", r"\1. ", text)
+    text = _NUMBERED_ITEM_RE.sub(r"\n\1. ", text)
+    text = _NUMBERED_START_RE.sub(r"\1. ", text)
 
     # Handle bullet points
-    text = re.sub(r"\n-\s+", r"\n- ", text)
-    text = re.sub(r"^-\s+", r"- ", text)
+    text = _BULLET_ITEM_RE.sub(r"\n- ", text)
+    text = _BULLET_START_RE.sub(r"- ", text)
 
     # Handle section headers
-    text = re.sub(r"\n([A-Za-z][A-Za-z\s]{2,30}):\s*\n", r"\n**\1:**\n\n", text)
+    text = _SECTION_HEADER_RE.sub(r"\n**\1:**\n\n", text)
 
     # Clean up multiple newlines
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _MULTI_NEWLINE_RE.sub("\n\n", text)
 
     # Clean up thinking
 
     if not show_thinking:
-        text = re.sub(r"<thinking>.*?</thinking>", "", text)
+        text = _THINKING_RE.sub("", text)
 
     return text.strip()
 